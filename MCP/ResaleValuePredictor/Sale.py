@@ -1,16 +1,99 @@
-import pandas as pd
-import numpy as np
+import time
+IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import glob
+import importlib.util
 import logging
-from typing import Any, Dict, Union
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import mean_squared_error
-from mcp.server.fastmcp import FastMCP
-from io import StringIO
-import re
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Union
+from mcp import types
+from mcp.server.fastmcp import Context, FastMCP
+from pathlib import Path
+from batching import MicroBatcher
+from prediction_cache import PredictionCache
+from metrics import NULL_TIMER, Metrics
+from prompt_parser import REFERENCE_YEAR, PromptParser
+
+# One lock for every lazy module: loading one can load others (training imports data_source),
+# and a single re-entrant lock cannot deadlock on the order in which threads take them
+_lazy_import_lock = threading.RLock()
+
+def _load_lazy_module(module: "_LazyModule"):
+    with _lazy_import_lock:
+        state = object.__getattribute__(module, "__dict__")
+        # Another thread finished the load while this one waited, or this thread is
+        # already running the module's code and is reading its partly built namespace
+        if type(module) is not _LazyModule or state.get("__lazy_loading__"):
+            return
+        state["__lazy_loading__"] = True
+        try:
+            state["__spec__"].loader.exec_module(module)
+            # Only now do attribute lookups stop coming through here, so no thread
+            # can see the module before its code has run
+            object.__setattr__(module, "__class__", ModuleType)
+        finally:
+            state.pop("__lazy_loading__", None)
+
+class _LazyModule(ModuleType):
+    """A module whose code runs on first attribute access, once, even with several threads racing."""
+
+    def __getattribute__(self, attr):
+        _load_lazy_module(self)
+        return ModuleType.__getattribute__(self, attr)
+
+    def __setattr__(self, attr, value):
+        _load_lazy_module(self)
+        ModuleType.__setattr__(self, attr, value)
+
+    def __delattr__(self, attr):
+        _load_lazy_module(self)
+        ModuleType.__delattr__(self, attr)
+
+def lazy_import(name: str):
+    """Register a module that is only imported when one of its attributes is first used.
+
+    Unlike importlib.util.LazyLoader, the load is thread-safe: the warm-up thread and
+    asyncio.to_thread workers may touch the same module first at the same time.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    module = importlib.util.module_from_spec(spec)
+    module.__class__ = _LazyModule
+    sys.modules[name] = module
+    return module
+
+# pandas, NumPy, joblib and everything that pulls in sklearn are imported on first use,
+# normally by the warm-up thread, so the server can answer the MCP handshake right away
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+joblib = lazy_import("joblib")
+bulk_scoring = lazy_import("bulk_scoring")
+comparables = lazy_import("comparables")
+data_source = lazy_import("data_source")
+fast_inference = lazy_import("fast_inference")
+model_registry = lazy_import("model_registry")
+training = lazy_import("training")
+valuation_grid = lazy_import("valuation_grid")
+
+# Training moved to training.py; these stay importable from Sale without importing sklearn up front
+TRAINING_EXPORTS = ("train_model_from_csv", "add_trees")
+
+def __getattr__(name: str):
+    if name in TRAINING_EXPORTS:
+        return getattr(training, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Initialize FastMCP
 mcp = FastMCP("resale")
@@ -744,31 +827,353 @@ Jeep,Grand Cherokee,2022,3,31820,45698,Good,27047
 Jeep,Grand Cherokee,2023,2,30674,27899,Excellent,27606
 """
 
-# Step 1: Load and train model
-def train_model_from_csv(csv_data: str):
-    df = pd.read_csv(StringIO(csv_data))
+# Training data: the inline CSV above, or a CSV/Parquet file named by RESALE_TRAINING_DATA
+TRAINING_DATA = os.environ.get("RESALE_TRAINING_DATA", CSV_DATA)
+
+# Hyperparameters and data-loading limits; they are part of the model artifact's content hash
+MODEL_PARAMS = {
+    "n_estimators": int(os.environ.get("RESALE_N_ESTIMATORS", 100)),
+    "max_depth": int(os.environ["RESALE_MAX_DEPTH"]) if os.environ.get("RESALE_MAX_DEPTH") else None,
+    "min_samples_leaf": int(os.environ.get("RESALE_MIN_SAMPLES_LEAF", 1)),
+    "random_state": 42,
+    "memory_budget_mb": float(os.environ.get("RESALE_TRAINING_MEMORY_MB", 512)),
+    "sampling": os.environ.get("RESALE_TRAINING_SAMPLING", "subsample"),
+    # Bounded, pruned trees served with float32 nodes (see training.train_model_from_csv)
+    "compact": os.environ.get("RESALE_COMPACT_MODEL", "0") == "1",
+    # "forest" (RandomForest on one-hot features) or "hist_gb" (native categorical gradient boosting)
+    "backend": os.environ.get("RESALE_MODEL_BACKEND", "forest"),
+}
+
+# Sales added through ingest_sales are stored here as immutable CSV parts
+INGEST_DIR = os.environ.get(
+    "RESALE_INGEST_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ingested")
+)
+
+def training_sources():
+    """The base training data plus every ingested sales part, in ingestion order."""
+    parts = sorted(glob.glob(os.path.join(INGEST_DIR, "sales-*.csv")))
+    return [TRAINING_DATA, *parts] if parts else TRAINING_DATA
+
+# Per-stage latency histograms and error counts; RESALE_METRICS_SAMPLE_RATE=0 turns timing off
+metrics = Metrics("resale", sample_rate=float(os.environ.get("RESALE_METRICS_SAMPLE_RATE", 1.0)))
+
+# Step 1: Load and train model (training itself lives in training.py)
+
+# Optional grid mode: precomputed approximate answers, enabled with RESALE_GRID_MODE=1
+GRID_MODE = os.environ.get("RESALE_GRID_MODE", "0") == "1"
+
+def build_valuation_grid(pipeline, sources):
+    """Precompute the valuation grid over the make/model pairs in the training data and log its cost."""
+    pairs = pd.concat(
+        chunk.astype(str).drop_duplicates() for chunk in data_source.iter_chunks(sources, columns=["make", "model"])
+    ).drop_duplicates().itertuples(index=False, name=None)
+    grid = valuation_grid.ValuationGrid.build(pipeline, pairs)
+    grid.report.update(grid.measure_error(pipeline))
+    logger.info(f"Valuation grid built: {grid.report}")
+    return grid
+
+# Memory for the comparable-sales index: training data that would need more is sampled down
+# to fit, and 0 turns find_comparable_sales off
+COMPARABLES_MEMORY_MB = float(os.environ.get("RESALE_COMPARABLES_MEMORY_MB", 256))
+
+def build_comparables_index(sources):
+    """Index the training records for find_comparable_sales and log its cost.
+
+    Returns None when the index is turned off. A model trained on the same records as
+    the served one shares its index rather than building a second copy.
+    """
+    if COMPARABLES_MEMORY_MB <= 0:
+        return None
+    fingerprint = model_registry.training_fingerprint(sources, {"stage": "comparables", "memory_budget_mb": COMPARABLES_MEMORY_MB})
+    current = served
+    if fingerprint is not None and current is not None and current.comparables is not None \
+            and current.comparables.fingerprint == fingerprint:
+        return current.comparables
+    index = comparables.ComparableSalesIndex.build(
+        data_source.iter_chunks(sources, columns=comparables.RECORD_COLUMNS), memory_budget_mb=COMPARABLES_MEMORY_MB
+    )
+    index.fingerprint = fingerprint
+    logger.info(f"Comparable-sales index built: {index.report}")
+    return index
+
+@dataclass(frozen=True)
+class ServedModel:
+    """Everything derived from one fitted pipeline; replaced as a whole on retrain or rollback."""
+    pipeline: Any
+    compiled: Any
+    # Class name of the fitted regressor, which pipeline may hold only as a CompiledRegressor
+    backend: str
+    grid: "Optional[valuation_grid.ValuationGrid]"
+    comparables: "Optional[comparables.ComparableSalesIndex]"
+    parser: PromptParser
+    version: str
+    training_seconds: Optional[float]
+    loaded_at: float
+
+def build_served_model(pipeline, meta, sources) -> ServedModel:
+    """Compile and index a fitted pipeline for serving.
+
+    When the compiled forest passes its parity check, the served pipeline keeps only
+    that copy: the sklearn trees are released rather than held as a second forest.
+    """
+    sample = next(data_source.iter_chunks(sources, chunksize=1000)).drop("estimated_resale_value", axis=1)
+    regressor = pipeline.named_steps["regressor"]
+    # Single-row fast path; None means fall back to pipeline.predict
+    compiled = fast_inference.compile_pipeline(pipeline, sample, float32=hasattr(regressor, "compaction_report_"))
+    grid = build_valuation_grid(pipeline, sources) if GRID_MODE else None
+    if compiled is not None:
+        attributes = {"compaction_report_": regressor.compaction_report_} if hasattr(regressor, "compaction_report_") else {}
+        pipeline = fast_inference.serving_pipeline(pipeline.named_steps["preprocessor"], compiled.forest, **attributes)
+    return ServedModel(
+        pipeline=pipeline,
+        compiled=compiled,
+        backend=type(regressor).__name__,
+        grid=grid,
+        comparables=build_comparables_index(sources),
+        parser=PromptParser.from_pipeline(pipeline, sample),
+        version=meta.get("fingerprint") or f"untracked-{id(pipeline):x}",
+        training_seconds=meta.get("fit_seconds"),
+        loaded_at=time.time(),
+    )
+
+def export_shared_model(current: ServedModel, path: str):
+    """Write what a worker process needs to serve `current` to a file it can memory-map.
+
+    The compiled forest, grid and other NumPy arrays are stored uncompressed, so every
+    worker that loads the file with mmap_mode="r" shares one copy through the page cache.
+    Models that cannot be compiled are stored as the full pipeline, which each worker
+    then unpickles into private memory.
+    """
+    payload = {
+        "version": current.version,
+        "training_seconds": current.training_seconds,
+        "compiled": current.compiled,
+        "backend": current.backend,
+        "preprocessor": current.pipeline.named_steps["preprocessor"],
+        "pipeline": current.pipeline if current.compiled is None else None,
+        "grid": current.grid,
+        "comparables": current.comparables,
+        "parser": current.parser,
+    }
+    joblib.dump(payload, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+def load_shared_model(path: str) -> ServedModel:
+    """Map a file written by export_shared_model; the sklearn trees are never loaded."""
+    payload = joblib.load(path, mmap_mode="r")
+    pipeline = payload["pipeline"]
+    if pipeline is None:
+        pipeline = fast_inference.serving_pipeline(payload["preprocessor"], payload["compiled"].forest)
+    logger.info(f"Mapped shared model {payload['version']} from {path}")
+    return ServedModel(
+        pipeline=pipeline,
+        compiled=payload["compiled"],
+        backend=payload["backend"],
+        grid=payload["grid"],
+        comparables=payload["comparables"],
+        parser=payload["parser"],
+        version=payload["version"],
+        training_seconds=payload["training_seconds"],
+        loaded_at=time.time(),
+    )
+
+# Set by serve_http.py for its worker processes, which serve a model exported by the parent
+SHARED_MODEL_PATH = os.environ.get("RESALE_SHARED_MODEL")
+
+def load_served_model() -> ServedModel:
+    """Map the shared model, or reuse the saved artifact for this data/params and retrain only when the hash changes."""
+    if SHARED_MODEL_PATH:
+        return load_shared_model(SHARED_MODEL_PATH)
+    sources = training_sources()
+    return build_served_model(
+        *model_registry.load_or_train(sources, training.train_model_from_csv, MODEL_PARAMS), sources
+    )
+
+# The served model; None until warm-up finishes
+served: Optional[ServedModel] = None
+
+# Recently served models, newest last, for rollback_model
+model_history = collections.deque(maxlen=int(os.environ.get("RESALE_MODEL_HISTORY", 5)))
+
+def predict_rows(rows):
+    """Predict a list of (make, model, year, age, mileage, condition, original_price) tuples."""
+    current = served
+    # Stages here are timed once per batch, not per request
+    timer = metrics.timer()
+    if current.compiled is not None:
+        X = current.compiled.transform_rows(rows)
+        timer.mark("batch_transform")
+        predictions = current.compiled.forest.predict(X)
+        timer.mark("batch_forest_predict")
+        return predictions
+    input_df = pd.DataFrame(rows, columns=["make", "model", "year", "age", "mileage", "condition", "original_price"])
+    timer.mark("batch_dataframe")
+    X = current.pipeline.named_steps["preprocessor"].transform(input_df)
+    timer.mark("batch_transform")
+    predictions = current.pipeline.named_steps["regressor"].predict(X)
+    timer.mark("batch_forest_predict")
+    return predictions
+
+# Concurrent single-row requests are batched and evaluated off the event loop
+batcher = MicroBatcher(
+    predict_rows,
+    max_batch_size=int(os.environ.get("RESALE_BATCH_MAX_SIZE", 256)),
+    max_wait_ms=float(os.environ.get("RESALE_BATCH_MAX_WAIT_MS", 2.0)),
+)
+
+# Predictions for repeated vehicles; RESALE_CACHE_MODE is "exact", "off" or "bucketed"
+# (opt-in and approximate: mileage and price are rounded to bucket midpoints before scoring)
+CACHE_MODE = os.environ.get("RESALE_CACHE_MODE", "exact")
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get("RESALE_CACHE_MAX_ENTRIES", 10000)),
+    ttl_seconds=float(os.environ.get("RESALE_CACHE_TTL_SECONDS", 3600)),
+    bucketed=CACHE_MODE == "bucketed",
+    mileage_bucket=float(os.environ.get("RESALE_CACHE_MILEAGE_BUCKET", 5000)),
+    price_bucket=float(os.environ.get("RESALE_CACHE_PRICE_BUCKET", 1000)),
+)
 
+def activate_model(new: ServedModel):
+    """Atomically make `new` the served model.
 
-    X = df.drop("estimated_resale_value", axis=1)
-    y = df["estimated_resale_value"]
+    Requests read `served` once, so each sees either the old or the new model, never a
+    mix. The cache is reset after the swap: predictions stored under the old version in
+    between are cleared, and later stores tagged with the old version are rejected.
+    """
+    global served
+    served = new
+    prediction_cache.set_model_version(new.version)
+    logger.info(f"Serving model {new.version} (trained in {new.training_seconds or 0:.1f} s)")
 
-    categorical_features = ["make", "model", "condition"]
-    numeric_features = ["year", "age", "mileage", "original_price"]
+def new_retrain_executor() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
 
-    preprocessor = ColumnTransformer([
-        ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_features),
-        ("num", StandardScaler(), numeric_features)
-    ])
+# Background retraining runs in a separate process so fitting never competes with serving
+# (not in serve_http.py workers, which serve a fixed shared model)
+retrain_executor = None if SHARED_MODEL_PATH else new_retrain_executor()
+retrain_state = {"running": False, "pending": False, "last_error": None, "last_duration_seconds": None}
+retrain_task = None
 
-    pipeline = Pipeline([
-        ("preprocessor", preprocessor),
-        ("regressor", RandomForestRegressor(n_estimators=100, random_state=42))
-    ])
+def replace_retrain_executor():
+    global retrain_executor
+    retrain_executor.shutdown(wait=False)
+    retrain_executor = new_retrain_executor()
 
-    pipeline.fit(X, y)
-    return pipeline
+# Fingerprints of the saved models this process has served and of the preprocessed data its
+# retrains cached; prune_artifacts deletes those that are no longer needed
+served_artifacts = set()
+preprocessed_artifacts = set()
 
-model = train_model_from_csv(CSV_DATA)
+def prune_artifacts(current_preprocessed: Optional[str]):
+    """Delete saved models that have left model_history, and preprocessed data of earlier training sources.
+
+    Each retrain writes both, and the preprocessed file holds the whole transformed
+    training matrix, so without this models/ grows with every ingest.
+    """
+    # The served model's artifact is reloaded by sklearn_pipeline, e.g. for bulk scoring
+    stale_models = served_artifacts - {m.version for m in model_history} - {served.version}
+    stale_preprocessed = preprocessed_artifacts - {current_preprocessed}
+    removed = model_registry.delete_artifacts(stale_models, stale_preprocessed)
+    served_artifacts.difference_update(stale_models)
+    preprocessed_artifacts.difference_update(stale_preprocessed)
+    if removed:
+        logger.info(f"Removed {removed} stale model artifact files")
+
+async def retrain_in_background():
+    """Retrain on the current training sources and swap the result in; reruns if more sales arrived meanwhile."""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            retrain_state["pending"] = False
+            sources = training_sources()
+            start = time.perf_counter()
+            try:
+                meta = await loop.run_in_executor(retrain_executor, training.retrain_to_artifact, sources, MODEL_PARAMS)
+                pipeline = await asyncio.to_thread(model_registry.load_model, meta["fingerprint"])
+                if pipeline is None:
+                    raise RuntimeError(f"Retrained artifact {meta['fingerprint']} could not be loaded")
+                new = await asyncio.to_thread(build_served_model, pipeline, meta, sources)
+                activate_model(new)
+                model_history.append(new)
+                served_artifacts.add(new.version)
+                if meta.get("preprocessed_fingerprint"):
+                    preprocessed_artifacts.add(meta["preprocessed_fingerprint"])
+                prune_artifacts(meta.get("preprocessed_fingerprint"))
+                retrain_state["last_error"] = None
+            except BrokenProcessPool as e:
+                # The training process died (e.g. killed for running out of memory), which
+                # breaks the pool for good; later retrains get a new one
+                logger.error(f"Background retraining process died: {e}")
+                retrain_state["last_error"] = f"Training process died: {e}"
+                replace_retrain_executor()
+            except Exception as e:
+                logger.error(f"Background retraining failed: {e}")
+                retrain_state["last_error"] = str(e)
+            retrain_state["last_duration_seconds"] = round(time.perf_counter() - start, 3)
+            if not retrain_state["pending"]:
+                break
+    finally:
+        retrain_state["running"] = False
+
+def schedule_retrain():
+    global retrain_task
+    if retrain_state["running"]:
+        retrain_state["pending"] = True
+        return
+    retrain_state["running"] = True
+    retrain_task = asyncio.get_running_loop().create_task(retrain_in_background())
+
+# Startup: the server answers the MCP handshake while the model loads in a background
+# thread; requests that arrive before it is ready wait on model_ready instead of failing
+WARM_UP_ROW = ("Toyota", "Camry", 2018, 6, 60000.0, "Good", 25000.0)
+model_ready = concurrent.futures.Future()
+startup_timings = {"import_seconds": None, "model_ready_seconds": None,
+                   "first_handshake_seconds": None, "first_prediction_seconds": None}
+warm_up_lock = threading.Lock()
+warm_up_thread = None
+
+def _warm_up():
+    try:
+        start = time.perf_counter()
+        new = load_served_model()
+        activate_model(new)
+        model_history.append(new)
+        if not SHARED_MODEL_PATH and not new.version.startswith("untracked-"):
+            served_artifacts.add(new.version)
+        predict_rows([WARM_UP_ROW])
+        startup_timings["model_ready_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+        logger.info(
+            f"Model ready {startup_timings['model_ready_seconds']:.2f} s after import "
+            f"(warm-up took {time.perf_counter() - start:.2f} s)"
+        )
+        model_ready.set_result(new)
+    except BaseException as e:
+        logger.error(f"Model warm-up failed: {e}")
+        model_ready.set_exception(e)
+
+def start_warm_up() -> concurrent.futures.Future:
+    """Start loading (or training) the model in the background, once; returns model_ready."""
+    global warm_up_thread
+    with warm_up_lock:
+        if warm_up_thread is None:
+            warm_up_thread = threading.Thread(target=_warm_up, name="resale-warm-up", daemon=True)
+            warm_up_thread.start()
+    return model_ready
+
+def warm_up() -> ServedModel:
+    """Load the model and block until it is served (for scripts and benchmarks)."""
+    start_warm_up().result()
+    return served
+
+async def ready_model() -> ServedModel:
+    """The served model, waiting for warm-up if it is still running."""
+    if served is None:
+        await asyncio.wrap_future(start_warm_up())
+    return served
+
+def record_first(name: str):
+    if startup_timings[name] is None:
+        startup_timings[name] = round(time.perf_counter() - IMPORT_STARTED, 3)
+        logger.info(f"Startup timing {name}={startup_timings[name]:.3f}")
 
 # Step 2: Input validation
 def validate_input(make, model, year, age, mileage, condition, original_price):
@@ -781,52 +1186,226 @@ def validate_input(make, model, year, age, mileage, condition, original_price):
     if original_price <= 0:
         raise ValueError("Original price must be positive")
 
+def validate_quantiles(quantiles):
+    if not all(0 <= q <= 1 for q in quantiles):
+        raise ValueError("Quantiles must be between 0 and 1")
+
+def quantile_label(q: float) -> str:
+    return f"p{q * 100:g}"
+
+def tree_outputs(current: ServedModel, rows) -> "np.ndarray":
+    """Every tree's prediction for each row, shape (n_rows, n_trees).
+
+    The compiled forest evaluates all trees in one vectorized pass; without it each
+    tree is asked separately.
+    """
+    if current.compiled is not None:
+        return current.compiled.tree_outputs(rows)
+    if not hasattr(current.pipeline.named_steps["regressor"], "estimators_"):
+        raise ValueError("Prediction intervals need the forest backend")
+    X = current.pipeline.named_steps["preprocessor"].transform(pd.DataFrame(rows, columns=list(fast_inference.INPUT_FIELDS)))
+    return np.stack([tree.predict(X) for tree in current.pipeline.named_steps["regressor"].estimators_], axis=1)
+
+# Record fields accepted by the batch tool, and the numeric ones among them
+BATCH_FIELDS = ["make", "model_name", "year", "age", "mileage", "condition", "original_price"]
+NUMERIC_FIELDS = ["year", "age", "mileage", "original_price"]
+
+def depreciation_grid(current: ServedModel, make, model_name, condition, original_price, years, mileages) -> "np.ndarray":
+    """Values of one vehicle at every (year, mileage) pair, shape (len(years), len(mileages)), from one predict call."""
+    year_grid, mileage_grid = np.meshgrid(np.asarray(years), np.asarray(mileages, dtype=np.float64), indexing="ij")
+    columns = {
+        "make": make,
+        "model": model_name,
+        "year": year_grid.ravel(),
+        # Same age convention as the prompt parser
+        "age": REFERENCE_YEAR - year_grid.ravel(),
+        "mileage": mileage_grid.ravel(),
+        "condition": condition,
+        "original_price": float(original_price),
+    }
+    if current.compiled is not None:
+        predictions = current.compiled.forest.predict(current.compiled.transform_columns(columns))
+    else:
+        predictions = current.pipeline.predict(pd.DataFrame(columns, columns=list(fast_inference.INPUT_FIELDS)))
+    return predictions.reshape(year_grid.shape)
+
+def validate_input_batch(df: "pd.DataFrame") -> "pd.Series":
+    """Columnar validate_input: the first error message for each row, or None if the row is valid."""
+    errors = pd.Series(None, index=df.index, dtype=object)
+
+    def flag(mask, message):
+        errors[mask & errors.isna()] = message
+
+    # Same notion of "missing" as the single-row tool, which rejects any falsy field
+    missing = pd.Series(False, index=df.index)
+    for field in BATCH_FIELDS:
+        col = df[field]
+        missing |= col.isna() | col.isin([0, ""])
+    flag(missing, "Missing required parameters. Please provide all car details.")
+
+    flag((df["year"] < 2000) | (df["year"] > 2024), "Input error: Year must be between 2000 and 2024")
+    flag(~df["condition"].isin(["Poor", "Fair", "Good", "Excellent"]),
+         "Input error: Condition must be one of: Poor, Fair, Good, Excellent")
+    flag(df["mileage"] < 0, "Input error: Mileage cannot be negative")
+    flag(df["original_price"] <= 0, "Input error: Original price must be positive")
+    return errors
+
+def records_frame(records: List[Dict[str, Any]], extra_numeric: List[str] = ()):
+    """Build a frame of BATCH_FIELDS (plus extra_numeric) from records and validate it.
+
+    Returns (frame, errors) where errors holds one message per invalid row and None elsewhere.
+    """
+    fields = BATCH_FIELDS + list(extra_numeric)
+    df = pd.DataFrame.from_records(records, columns=fields) if records else pd.DataFrame(columns=fields)
+    return coerce_frame(df, extra_numeric)
+
+def coerce_frame(df: "pd.DataFrame", extra_numeric: List[str] = ()):
+    """Convert the numeric fields of a frame of BATCH_FIELDS (plus extra_numeric) and validate it; see records_frame."""
+    df = df.copy()
+    not_numeric = {}
+    for field in NUMERIC_FIELDS + list(extra_numeric):
+        coerced = pd.to_numeric(df[field], errors="coerce")
+        not_numeric[field] = df[field].notna() & coerced.isna()
+        df[field] = coerced
+
+    errors = validate_input_batch(df)
+    for field in extra_numeric:
+        errors[df[field].isna() & errors.isna()] = f"Input error: {field} is required"
+    # Values that were given but failed numeric coercion are reported as such, not as missing
+    for field, mask in not_numeric.items():
+        errors[mask] = f"Input error: {field} must be a number"
+    return df, errors
+
+def predict_batch(current: ServedModel, records: List[Dict[str, Any]], quantiles: List[float] = None) -> List[Dict[str, Any]]:
+    """Validate and score many records with a single model.predict call, preserving input order.
+
+    With quantiles, each result also carries those quantiles of the per-tree predictions.
+    Runs in a worker thread, so it only reads the model it is given.
+    """
+    prompted = [i for i, record in enumerate(records) if record.get("prompt")]
+    if prompted:
+        # Fields given explicitly take precedence over ones parsed from the prompt
+        records = list(records)
+        parsed = current.parser.parse_many(records[i]["prompt"] for i in prompted)
+        for i, fields in zip(prompted, parsed):
+            records[i] = {**fields, **{k: v for k, v in records[i].items() if v is not None}}
+    df, errors = records_frame(records)
+    valid = errors.isna().to_numpy()
+    predictions = np.empty(len(df))
+    if quantiles:
+        validate_quantiles(quantiles)
+        labels = [quantile_label(q) for q in quantiles]
+        bounds = np.empty((len(df), len(quantiles)))
+        if valid.any():
+            rows = list(df.loc[valid, BATCH_FIELDS].itertuples(index=False, name=None))
+            predictions[valid], bounds[valid] = fast_inference.quantile_summary(tree_outputs(current, rows), quantiles)
+    elif valid.any():
+        input_df = df.loc[valid].rename(columns={"model_name": "model"})
+        predictions[valid] = current.pipeline.predict(input_df)
+
+    results = []
+    for i, (ok, error) in enumerate(zip(valid, errors)):
+        if ok:
+            result = {"index": i, "estimated_resale_value": round(float(predictions[i]), 2)}
+            if quantiles:
+                result["quantiles"] = {label: round(float(b), 2) for label, b in zip(labels, bounds[i])}
+            results.append(result)
+        else:
+            results.append({"index": i, "error": error})
+    return results
+
+def sklearn_pipeline(current: ServedModel):
+    """The fitted sklearn pipeline behind `current`, or None if its artifact cannot be loaded.
+
+    A compiled model is served without its sklearn trees, so they are reloaded from the
+    saved artifact; callers hold them only as long as they need them.
+    """
+    if current.compiled is None:
+        return current.pipeline
+    return model_registry.load_model(current.version)
+
+def load_bulk_regressor(current: ServedModel):
+    """The sklearn forest behind a compiled model, reloaded from its artifact, or None.
+
+    On large chunks sklearn's own tree traversal beats the compiled forest, which steps
+    every tree max_depth times, so bulk scoring loads it for the length of a job.
+    """
+    if current.compiled is None:
+        return None
+    pipeline = sklearn_pipeline(current)
+    regressor = pipeline.named_steps["regressor"] if pipeline is not None else None
+    if getattr(regressor, "n_features_in_", None) != current.compiled.n_features:
+        return None
+    return regressor
+
+def predict_frame(current: ServedModel, df: "pd.DataFrame", regressor=None) -> "np.ndarray":
+    """Predict a validated frame of BATCH_FIELDS column-wise, without building per-row tuples.
+
+    regressor, from load_bulk_regressor, replaces the compiled forest for compiled models.
+    """
+    if current.compiled is not None:
+        columns = {field: df[name].to_numpy() for field, name in zip(fast_inference.INPUT_FIELDS, BATCH_FIELDS)}
+        # The compiled transform skips the ColumnTransformer
+        X = current.compiled.transform_columns(columns)
+        return regressor.predict(X) if regressor is not None else current.compiled.forest.predict(X)
+    return current.pipeline.predict(df.rename(columns={"model_name": "model"}))
+
+# Parquet column types of score_vehicle_chunk's output: scored rows hold the numbers the model
+# was given, rejected rows the input fields as they appeared, which need not be numbers
+SCORED_COLUMN_TYPES = {
+    **{field: "string" for field in ["make", "model", "model_name", "condition"]},
+    **{field: "double" for field in NUMERIC_FIELDS + ["estimated_resale_value"]},
+}
+REJECTED_COLUMN_TYPES = {
+    **{field: "string" for field in BATCH_FIELDS + ["model"]},
+    "row": "int64",
+    "error": "string",
+}
+
+def score_vehicle_chunk(current: ServedModel, chunk: "pd.DataFrame", regressor=None):
+    """Score one chunk of a vehicle file for bulk_scoring.score_file.
+
+    Returns (the valid rows with estimated_resale_value added, the invalid rows with
+    their input row number and error). Columns other than BATCH_FIELDS, such as stock
+    numbers, are passed through. The model column may be called model or model_name.
+    regressor is passed on to predict_frame.
+    """
+    df = chunk.rename(columns={"model": "model_name"})
+    missing = [field for field in BATCH_FIELDS if field not in df.columns]
+    if missing:
+        raise ValueError(f"Input file is missing columns: {', '.join(missing)}")
+    df, errors = coerce_frame(df[BATCH_FIELDS])
+    valid = errors.isna().to_numpy()
+    predictions = predict_frame(current, df[valid], regressor) if valid.any() else np.empty(0)
+    scored = chunk[valid].assign(estimated_resale_value=np.round(predictions, 2))
+    rejected = chunk[~valid].assign(error=errors[~valid].astype("string"))
+    rejected.insert(0, "row", rejected.index)
+    return scored, rejected
+
 def parse_natural_language(prompt: str) -> Dict[str, Union[str, int, float]]:
     """Parse natural language input to extract car details."""
-    # Initialize default values
-    result = {
-        "make": None,
-        "model_name": None,
-        "year": None,
-        "age": None,
-        "mileage": None,
-        "condition": None,
-        "original_price": None
-    }
-    
     try:
-        # Extract year
-        year_match = re.search(r'(\d{4})', prompt)
-        if year_match:
-            result["year"] = int(year_match.group(1))
-            result["age"] = 2024 - result["year"]  # Calculate age based on current year
-        
-        # Extract make and model
-        make_model_match = re.search(r'(\w+)\s+(\w+)', prompt)
-        if make_model_match:
-            result["make"] = make_model_match.group(1)
-            result["model_name"] = make_model_match.group(2)
-        
-        # Extract condition
-        condition_match = re.search(r'(poor|fair|good|excellent)', prompt.lower())
-        if condition_match:
-            result["condition"] = condition_match.group(1).capitalize()
-        
-        # Extract mileage
-        mileage_match = re.search(r'(\d+(?:,\d+)*)\s*mileage', prompt)
-        if mileage_match:
-            result["mileage"] = float(mileage_match.group(1).replace(',', ''))
-        
-        # Extract original price
-        price_match = re.search(r'(\d+(?:,\d+)*)\s*(?:dollars|dollar|\$)?', prompt)
-        if price_match:
-            result["original_price"] = float(price_match.group(1).replace(',', ''))
-        
-        return result
+        return served.parser.parse(prompt)
     except Exception as e:
         logger.error(f"Error parsing natural language input: {e}")
         return None
 
+async def predict_one(row, timer=NULL_TIMER):
+    """Predict a validated row through the prediction cache and the micro-batcher."""
+    if CACHE_MODE == "off":
+        prediction = await batcher.submit(row)
+        timer.mark("model")
+        return prediction
+    key, row = prediction_cache.normalize(row)
+    prediction = prediction_cache.get(key)
+    timer.mark("cache_lookup")
+    if prediction is None:
+        version = prediction_cache.model_version
+        prediction = await batcher.submit(row)
+        timer.mark("model")
+        prediction_cache.put(key, prediction, version)
+    return prediction
+
 # Step 3: FastMCP tool
 @mcp.tool()
 async def estimate_resale_value(
@@ -837,14 +1416,22 @@ async def estimate_resale_value(
     mileage: float = None,
     condition: str = None,
     original_price: float = None,
-    prompt: str = None
+    prompt: str = None,
+    quantiles: List[float] = None
 ) -> str:
-    """Estimate the resale value of a car. Can accept either structured parameters or a natural language prompt."""
+    """Estimate the resale value of a car. Can accept either structured parameters or a natural language prompt.
+
+    Pass quantiles (e.g. [0.1, 0.9]) to also get that range of the individual trees' estimates.
+    """
+    await ready_model()
+    timer = metrics.timer()
     try:
         # If prompt is provided, parse it
         if prompt:
             parsed_data = parse_natural_language(prompt)
+            timer.mark("parse")
             if not parsed_data:
+                metrics.count_error("parse_failed")
                 return "Failed to parse the input prompt. Please provide car details in a clear format."
             
             # Update parameters with parsed data
@@ -858,28 +1445,366 @@ async def estimate_resale_value(
         
         # Validate all required parameters are present
         if not all([make, model_name, year, age, mileage, condition, original_price]):
+            metrics.count_error("missing_parameters")
             return "Missing required parameters. Please provide all car details."
         
         validate_input(make, model_name, year, age, mileage, condition, original_price)
+        timer.mark("validate")
         
-        input_df = pd.DataFrame([{
-            "make": make,
-            "model": model_name,
-            "year": year,
-            "age": age,
-            "mileage": mileage,
-            "condition": condition,
-            "original_price": original_price
-        }])
-        
-        prediction = model.predict(input_df)[0]
-        return f"Estimated resale value: ${round(prediction, 2)}"
+        row = (make, model_name, year, age, mileage, condition, original_price)
+        if quantiles:
+            # Ranges come from the trees themselves, so the grid and the cache are skipped
+            validate_quantiles(quantiles)
+            outputs = await asyncio.to_thread(tree_outputs, served, [row])
+            means, bounds = fast_inference.quantile_summary(outputs, quantiles)
+            timer.mark("model")
+            ranges = ", ".join(
+                f"{quantile_label(q).upper()}: ${round(float(b), 2)}" for q, b in zip(quantiles, bounds[0])
+            )
+            result = f"Estimated resale value: ${round(float(means[0]), 2)} ({ranges})"
+            timer.mark("format")
+            timer.finish()
+            return result
+
+        grid = served.grid
+        prediction = None
+        if grid is not None:
+            prediction = grid.lookup(*row)
+            timer.mark("grid_lookup")
+        approximate = False
+        if prediction is None:
+            prediction = await predict_one(row, timer)
+            approximate = CACHE_MODE == "bucketed"
+        result = f"Estimated resale value: ${round(prediction, 2)}"
+        if approximate:
+            result += " (approximate: mileage and original price rounded to cache buckets)"
+        timer.mark("format")
+        timer.finish()
+        record_first("first_prediction_seconds")
+        return result
     except ValueError as e:
+        metrics.count_error("ValueError")
         return f"Input error: {e}"
     except Exception as e:
+        metrics.count_error(type(e).__name__)
         logger.error(f"Prediction error: {e}")
         return "Failed to estimate resale value due to internal error."
 
+@mcp.tool()
+async def estimate_resale_values_batch(
+    vehicles: List[Dict[str, Any]], quantiles: List[float] = None
+) -> List[Dict[str, Any]]:
+    """Estimate resale values for many cars in one call.
+
+    Args:
+        vehicles: Records with make, model_name, year, age, mileage, condition and original_price,
+            or with a natural language "prompt" (explicit fields override parsed ones).
+            Results come back in input order, each with either estimated_resale_value or error.
+        quantiles: Optional quantiles of the per-tree estimates to add to each result, e.g. [0.1, 0.9]
+    """
+    current = await ready_model()
+    try:
+        # Large batches are scored off the event loop so other requests keep being served
+        return await asyncio.to_thread(predict_batch, current, vehicles, quantiles)
+    except ValueError as e:
+        return [{"index": i, "error": f"Input error: {e}"} for i in range(len(vehicles))]
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        return [{"index": i, "error": "Failed to estimate resale value due to internal error."}
+                for i in range(len(vehicles))]
+
+@mcp.tool()
+async def find_comparable_sales(
+    make: str = None,
+    model_name: str = None,
+    year: int = None,
+    mileage: float = None,
+    original_price: float = None,
+    prompt: str = None,
+    k: int = 5
+) -> Dict[str, Any]:
+    """Find the k historical sales of the same make/model closest in year, mileage and original price.
+
+    Args:
+        make, model_name, year, mileage, original_price: The vehicle to compare against,
+            or a natural language prompt (explicit fields override parsed ones)
+        k: Number of sales to return, nearest first, each with the price it sold for
+            (estimated_resale_value) and its scaled distance from the vehicle
+    """
+    current = await ready_model()
+    timer = metrics.timer()
+    if prompt:
+        parsed = current.parser.parse(prompt)
+        make = make or parsed["make"]
+        model_name = model_name or parsed["model_name"]
+        year = year or parsed["year"]
+        mileage = mileage if mileage is not None else parsed["mileage"]
+        original_price = original_price or parsed["original_price"]
+    if not all([make, model_name, year, original_price]) or mileage is None:
+        metrics.count_error("missing_parameters")
+        return {"error": "Missing required parameters: make, model_name, year, mileage and original_price."}
+    if k < 1:
+        return {"error": "Input error: k must be at least 1"}
+    if current.comparables is None:
+        return {"error": "Comparable sales are turned off on this server (RESALE_COMPARABLES_MEMORY_MB=0)."}
+    sales = current.comparables.query(make, model_name, year, mileage, original_price, k=k)
+    timer.finish("comparables")
+    if sales is None:
+        return {"error": f"No recorded sales of {make} {model_name}."}
+    return {"make": make, "model_name": model_name, "comparables": sales}
+
+# Largest year x mileage grid depreciation_curve will score in one call
+CURVE_MAX_POINTS = int(os.environ.get("RESALE_CURVE_MAX_POINTS", 100000))
+
+@mcp.tool()
+async def depreciation_curve(
+    make: str,
+    model_name: str,
+    condition: str,
+    original_price: float,
+    year_from: int = 2000,
+    year_to: int = 2024,
+    year_step: int = 1,
+    mileage_from: float = 0,
+    mileage_to: float = 300000,
+    mileage_step: float = 10000,
+    format: str = "text"
+) -> Union[str, Dict[str, Any]]:
+    """Value of one vehicle at every model year and mileage in the given ranges (inclusive), scored in one call.
+
+    Args:
+        make, model_name, condition, original_price: The vehicle
+        year_from, year_to, year_step: Model years to cover
+        mileage_from, mileage_to, mileage_step: Mileages to cover
+        format: "text" for one line per year, or "columns" for parallel year, age, mileage
+            and estimated_resale_value arrays (one entry per grid point, mileage varying fastest)
+    """
+    current = await ready_model()
+    timer = metrics.timer()
+    try:
+        if year_step < 1 or mileage_step <= 0:
+            raise ValueError("year_step and mileage_step must be positive")
+        if year_from > year_to or mileage_from > mileage_to:
+            raise ValueError("Range starts must not exceed range ends")
+        years = np.arange(year_from, year_to + 1, year_step)
+        mileages = np.arange(mileage_from, mileage_to + mileage_step / 2, mileage_step, dtype=np.float64)
+        if years.size * mileages.size > CURVE_MAX_POINTS:
+            raise ValueError(f"The curve has {years.size * mileages.size} points; the limit is {CURVE_MAX_POINTS}")
+        for year, mileage in ((years[0], mileages[0]), (years[-1], mileages[-1])):
+            validate_input(make, model_name, int(year), REFERENCE_YEAR - int(year), mileage, condition, original_price)
+        timer.mark("curve_validate")
+
+        values = await asyncio.to_thread(
+            depreciation_grid, current, make, model_name, condition, original_price, years, mileages
+        )
+        timer.mark("curve_predict")
+        if format == "columns":
+            result = {
+                "make": make,
+                "model_name": model_name,
+                "condition": condition,
+                "original_price": original_price,
+                "year": np.repeat(years, mileages.size).tolist(),
+                "age": np.repeat(REFERENCE_YEAR - years, mileages.size).tolist(),
+                "mileage": np.tile(mileages, years.size).tolist(),
+                "estimated_resale_value": values.ravel().round(2).tolist(),
+            }
+        else:
+            header = "mileage: " + " ".join(f"{m / 1000:g}k" for m in mileages)
+            lines = [f"{year}: " + " ".join(f"${v:,.0f}" for v in row) for year, row in zip(years.tolist(), values)]
+            result = f"{make} {model_name}, {condition}, originally ${original_price:,.0f}\n{header}\n" + "\n".join(lines)
+        timer.mark("curve_format")
+        timer.finish("curve_total")
+        return result
+    except ValueError as e:
+        metrics.count_error("ValueError")
+        return f"Input error: {e}"
+    except Exception as e:
+        metrics.count_error(type(e).__name__)
+        logger.error(f"Depreciation curve error: {e}")
+        return "Failed to compute depreciation curve due to internal error."
+
+# score_vehicle_file reads and writes only inside this directory, since over HTTP any client
+# can call it; relative paths are taken relative to it
+BULK_DIR = os.environ.get(
+    "RESALE_BULK_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bulk")
+)
+
+def bulk_path(path: str) -> str:
+    """Resolve a client-supplied path inside BULK_DIR, following symlinks; ValueError if it ends up outside."""
+    root = Path(BULK_DIR).resolve()
+    resolved = (root / path).resolve()
+    if not resolved.is_relative_to(root):
+        raise ValueError(f"{path} is outside the bulk scoring directory")
+    return str(resolved)
+
+@mcp.tool()
+async def score_vehicle_file(
+    input_path: str,
+    output_path: str,
+    rejects_path: str = None,
+    chunksize: int = 50000,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """Score every vehicle in a CSV or Parquet file of any size, streaming it in chunks.
+
+    All paths must be inside the server's bulk scoring directory (RESALE_BULK_DIR);
+    relative paths are resolved against it.
+
+    Args:
+        input_path: File with make, model (or model_name), year, age, mileage, condition
+            and original_price columns; other columns are copied to the output
+        output_path: Where to write the valid rows plus estimated_resale_value (.csv or .parquet)
+        rejects_path: Where to write invalid rows with their row number and error
+            (default: the output path with .rejects before the extension)
+        chunksize: Rows read, scored and written at a time
+    """
+    current = await ready_model()
+    loop = asyncio.get_running_loop()
+
+    def report(progress):
+        message = bulk_scoring.describe_progress(progress)
+        logger.info(f"Scoring {input_path}: {message}")
+        if ctx is not None:
+            asyncio.run_coroutine_threadsafe(ctx.report_progress(progress["rows"], None, message), loop)
+
+    try:
+        input_path, output_path = bulk_path(input_path), bulk_path(output_path)
+        rejects_path = bulk_path(rejects_path or bulk_scoring.default_rejects_path(output_path))
+        os.makedirs(BULK_DIR, exist_ok=True)
+        regressor = await asyncio.to_thread(load_bulk_regressor, current)
+        return await asyncio.to_thread(
+            bulk_scoring.score_file, input_path, output_path,
+            functools.partial(score_vehicle_chunk, current, regressor=regressor),
+            rejects_path=rejects_path, chunksize=chunksize, progress=report,
+            output_types=SCORED_COLUMN_TYPES, rejects_types=REJECTED_COLUMN_TYPES,
+        )
+    except (ValueError, OSError) as e:
+        return {"error": f"Input error: {e}"}
+    except Exception as e:
+        logger.error(f"Bulk scoring error: {e}")
+        return {"error": "Failed to score vehicle file due to internal error."}
+
+@mcp.tool()
+async def get_batching_stats() -> Dict[str, Any]:
+    """Queue depth, batch-size distribution and queue wait of the prediction micro-batcher."""
+    return batcher.stats()
+
+@mcp.tool()
+async def get_cache_stats() -> Dict[str, Any]:
+    """Hit, miss and eviction counters of the prediction cache."""
+    return prediction_cache.stats()
+
+@mcp.tool()
+async def get_metrics(format: str = "json") -> Union[Dict[str, Any], str]:
+    """Per-stage latency histograms and error counts for estimate_resale_value.
+
+    Args:
+        format: "json" for a summary, "prometheus" for the Prometheus text exposition format
+    """
+    if format == "prometheus":
+        return metrics.prometheus_text()
+    return metrics.snapshot()
+
+@mcp.resource("metrics://resale", mime_type="text/plain")
+def metrics_resource() -> str:
+    """Prometheus text dump of the resale server's metrics."""
+    return metrics.prometheus_text()
+
+@mcp.tool()
+async def ingest_sales(sales: List[Dict[str, Any]]) -> str:
+    """Add sold-vehicle records to the training data and retrain the model in the background.
+
+    Args:
+        sales: Records with make, model_name, year, age, mileage, condition, original_price
+            and the price the car actually sold for as estimated_resale_value
+    """
+    await ready_model()
+    try:
+        df, errors = records_frame(sales, extra_numeric=["estimated_resale_value"])
+        errors[(df["estimated_resale_value"] <= 0) & errors.isna()] = "Input error: estimated_resale_value must be positive"
+        valid = df[errors.isna()].rename(columns={"model_name": "model"})
+        rejected = [f"#{i}: {error}" for i, error in errors.dropna().items()]
+        if valid.empty:
+            return "No valid sales to ingest. " + "; ".join(rejected[:5])
+
+        # Each ingest is written to its own file and renamed into place, so a retrain
+        # that is already reading the directory never sees a half-written part
+        os.makedirs(INGEST_DIR, exist_ok=True)
+        path = os.path.join(INGEST_DIR, f"sales-{time.time_ns()}.csv")
+        columns = ["make", "model", "year", "age", "original_price", "mileage", "condition", "estimated_resale_value"]
+        valid[columns].to_csv(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+
+        if SHARED_MODEL_PATH:
+            # Workers share one read-only model; the parent picks the sales up when it restarts
+            message = f"Ingested {len(valid)} sales; they will be trained on when the server restarts."
+        else:
+            schedule_retrain()
+            message = f"Ingested {len(valid)} sales; retraining in the background (serving model {served.version})."
+        if rejected:
+            message += f" Rejected {len(rejected)}: " + "; ".join(rejected[:5])
+        return message
+    except Exception as e:
+        logger.error(f"Ingest error: {e}")
+        return "Failed to ingest sales due to internal error."
+
+@mcp.tool()
+async def rollback_model() -> str:
+    """Go back to the previously served model version."""
+    await ready_model()
+    if len(model_history) < 2:
+        return "No previous model to roll back to."
+    current = model_history.pop()
+    activate_model(model_history[-1])
+    return f"Rolled back from model {current.version} to {served.version}."
+
+@mcp.tool()
+async def get_model_info() -> Dict[str, Any]:
+    """Version, training duration and load time of the served model, plus retraining and startup status."""
+    current = served
+    if current is None:
+        return {"ready": False, "startup": dict(startup_timings)}
+    return {
+        "ready": True,
+        "version": current.version,
+        "training_seconds": current.training_seconds,
+        "loaded_at": current.loaded_at,
+        "compiled_inference": current.compiled is not None,
+        "compiled_bytes": current.compiled.forest.nbytes if current.compiled is not None else None,
+        "backend": current.backend,
+        "model_bytes": training.regressor_nbytes(current.pipeline.named_steps["regressor"]),
+        "compaction": getattr(current.pipeline.named_steps["regressor"], "compaction_report_", None),
+        "grid_mode": current.grid is not None,
+        "history": [m.version for m in model_history],
+        "retraining": dict(retrain_state),
+        "startup": dict(startup_timings),
+    }
+
+# The first InitializedNotification marks the end of the first client handshake. FastMCP
+# has no hook for it, so the handler is registered on the low-level server directly. That
+# is a private attribute: if an SDK upgrade removes it, startup goes on without the timing.
+def register_handshake_timer(server: FastMCP) -> bool:
+    handlers = getattr(getattr(server, "_mcp_server", None), "notification_handlers", None)
+    if not isinstance(handlers, dict):
+        logger.warning("This MCP SDK has no notification_handlers hook; first_handshake_seconds will not be recorded")
+        return False
+    previous = handlers.get(types.InitializedNotification)
+
+    async def on_initialized(notification: types.InitializedNotification):
+        record_first("first_handshake_seconds")
+        if previous is not None:
+            await previous(notification)
+
+    handlers[types.InitializedNotification] = on_initialized
+    return True
+
+register_handshake_timer(mcp)
+
+startup_timings["import_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+
 # Step 4: Run the server
 if __name__ == "__main__":
+    logger.info(f"Imported in {startup_timings['import_seconds']:.3f} s; loading the model in the background")
+    start_warm_up()
     mcp.run(transport="stdio")
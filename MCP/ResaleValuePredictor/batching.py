@@ -0,0 +1,134 @@
+import asyncio
+import collections
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Queue concurrent single-row predictions and run them as batches off the event loop.
+
+    A row that arrives alone, with nothing else queued, runs at once. Otherwise a batch
+    closes when it reaches max_batch_size rows or max_wait_ms after its first row arrived,
+    whichever comes first; rows that queue up while a batch is running form the next one.
+    predict_fn receives the list of rows and must return one prediction per row; it runs
+    in the executor so the event loop keeps serving.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[Any]], Sequence[float]],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 2.0,
+        executor: Optional[Executor] = None,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        # A worker thread keeps the event loop free without shipping the model to another process
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="resale-predict")
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+        self.batches = 0
+        self.rows = 0
+        self.max_seen_batch = 0
+        self.batch_size_counts = collections.Counter()
+        self._recent_waits = collections.deque(maxlen=4096)
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, row: Any) -> float:
+        """Queue one row and wait for its prediction."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((row, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if len(batch) == 1:
+                # Nothing else is waiting, so holding a lone request for the window only adds latency
+                await self._dispatch(batch)
+                continue
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Drain whatever is already queued before paying for a timed wait
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        started = time.perf_counter()
+        # Callers that gave up while queued don't need their rows evaluated
+        batch = [item for item in batch if not item[1].done()]
+        if not batch:
+            return
+        for _, _, queued_at in batch:
+            self._recent_waits.append(started - queued_at)
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_seen_batch = max(self.max_seen_batch, len(batch))
+        self.batch_size_counts[_size_bucket(len(batch))] += 1
+
+        rows = [row for row, _, _ in batch]
+        try:
+            predictions = await self._loop.run_in_executor(self.executor, self.predict_fn, rows)
+        except Exception as e:
+            logger.error(f"Batch of {len(rows)} predictions failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result(float(prediction))
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._recent_waits)
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_seen_batch,
+            "batch_size_histogram": {k: self.batch_size_counts[k] for k in sorted(self.batch_size_counts)},
+            "queue_wait_ms_p50": round(_percentile(waits, 0.50) * 1000, 3),
+            "queue_wait_ms_p99": round(_percentile(waits, 0.99) * 1000, 3),
+            "window": {"max_batch_size": self.max_batch_size, "max_wait_ms": self.max_wait * 1000},
+        }
+
+
+def _size_bucket(n: int) -> int:
+    """Round a batch size up to the next power of two for the histogram."""
+    bucket = 1
+    while bucket < n:
+        bucket *= 2
+    return bucket
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
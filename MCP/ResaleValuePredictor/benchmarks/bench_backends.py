@@ -0,0 +1,95 @@
+"""Side-by-side comparison of the regressor backends on the same data.
+
+For each backend: fit time, input width after preprocessing, pickled model size, holdout
+RMSE, single-row latency through the path the server would use (compiled forest when
+available, pipeline.predict otherwise) and 1000-row batch latency. Pass a vocabulary
+multiplier to make every model name appear in that many variants, which widens the
+one-hot input the forest sees (the hist_gb backend supports up to 255 categories per column).
+
+Usage: python benchmarks/bench_backends.py [rows_multiplier] [vocabulary_multiplier]
+"""
+import json
+import os
+import pickle
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_training import synthetic_frame  # noqa: E402
+from fast_inference import INPUT_FIELDS, compile_pipeline  # noqa: E402
+from sklearn.model_selection import train_test_split  # noqa: E402
+from training import BACKENDS, train_model_from_csv  # noqa: E402
+
+
+def widen_vocabulary(df, variants: int, seed: int = 0):
+    """Split each model into `variants` names ("Civic 0", "Civic 1", ...) assigned at random."""
+    if variants <= 1:
+        return df
+    df = df.copy()
+    suffix = np.random.default_rng(seed).integers(0, variants, len(df)).astype(str)
+    df["model"] = df["model"].astype(str) + " " + suffix
+    return df
+
+
+def measure(backend, train, test):
+    X_test = test.drop("estimated_resale_value", axis=1)
+    y_test = test["estimated_resale_value"].to_numpy()
+
+    start = time.perf_counter()
+    pipeline = train_model_from_csv(train, backend=backend)
+    fit_seconds = time.perf_counter() - start
+
+    compiled = compile_pipeline(pipeline, X_test.head(200))
+    rows = list(X_test[list(INPUT_FIELDS)].itertuples(index=False, name=None))
+    if compiled is not None:
+        predict_one = compiled.predict_one
+    else:
+        def predict_one(row):
+            # Same fallback the server's predict_rows uses
+            return pipeline.predict(pd.DataFrame([row], columns=list(INPUT_FIELDS)))
+    latencies = []
+    for row in rows[:200]:
+        start = time.perf_counter()
+        predict_one(row)
+        latencies.append(time.perf_counter() - start)
+
+    batch = X_test.head(1000)
+    start = time.perf_counter()
+    pipeline.predict(batch)
+    batch_seconds = time.perf_counter() - start
+
+    width = pipeline.named_steps["preprocessor"].transform(X_test.head(1)).shape[1]
+    return {
+        "backend": backend,
+        "fit_seconds": round(fit_seconds, 3),
+        "input_width": int(width),
+        "model_bytes": len(pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)),
+        "holdout_rmse": round(float(np.sqrt(np.mean((pipeline.predict(X_test) - y_test) ** 2))), 2),
+        "single_row_path": "compiled" if compiled is not None else "pipeline.predict",
+        "single_row_us_median": round(statistics.median(latencies) * 1e6, 1),
+        "batch_rows": len(batch),
+        "batch_ms": round(batch_seconds * 1000, 2),
+    }
+
+
+def main(multiplier: int, variants: int):
+    df = widen_vocabulary(synthetic_frame(multiplier), variants)
+    train, test = train_test_split(df, test_size=0.2, random_state=0)
+    print(f"rows: {len(df)}, models: {df['model'].nunique()}")
+    results = [measure(backend, train, test) for backend in BACKENDS]
+    for r in results:
+        print(f"{r['backend']:<8} fit={r['fit_seconds']:>7} s width={r['input_width']:>4} "
+              f"size={r['model_bytes'] / 1e6:6.2f} MB RMSE={r['holdout_rmse']:>9} "
+              f"single={r['single_row_us_median']:>8} us ({r['single_row_path']}) "
+              f"batch[{r['batch_rows']}]={r['batch_ms']} ms")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4, int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -0,0 +1,57 @@
+"""Compare per-call estimate_resale_value against one estimate_resale_values_batch call.
+
+Usage: python benchmarks/bench_batch.py [n_vehicles]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sale  # noqa: E402
+
+
+def sample_vehicles(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    pairs = Sale.pd.read_csv(StringIO(Sale.CSV_DATA))[["make", "model"]].drop_duplicates().values.tolist()
+    vehicles = []
+    for _ in range(n):
+        make, model_name = rng.choice(pairs)
+        year = rng.randint(2000, 2024)
+        vehicles.append({
+            "make": make,
+            "model_name": model_name,
+            "year": year,
+            "age": max(2025 - year, 1),
+            "mileage": rng.randint(1000, 300000),
+            "condition": rng.choice(["Poor", "Fair", "Good", "Excellent"]),
+            "original_price": rng.randint(15000, 80000),
+        })
+    return vehicles
+
+
+async def main(n: int):
+    Sale.warm_up()
+    vehicles = sample_vehicles(n)
+
+    start = time.perf_counter()
+    for v in vehicles:
+        await Sale.estimate_resale_value(**v)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await Sale.estimate_resale_values_batch(vehicles)
+    batch_seconds = time.perf_counter() - start
+
+    assert len(results) == n and all("estimated_resale_value" in r for r in results)
+    print(f"vehicles:        {n}")
+    print(f"per-call loop:   {loop_seconds:.3f} s ({n / loop_seconds:,.0f} rows/s)")
+    print(f"batch tool:      {batch_seconds:.3f} s ({n / batch_seconds:,.0f} rows/s)")
+    print(f"speedup:         {loop_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
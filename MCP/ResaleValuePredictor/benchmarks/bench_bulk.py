@@ -0,0 +1,82 @@
+"""Throughput and peak memory of bulk_scoring.score_file as the input file grows.
+
+Writes vehicle files of increasing size (replicated training rows with jittered
+mileage and price, a stock_id column and 0.1% invalid rows). Each one is scored by a
+fresh interpreter, which reports rows/s and its peak RSS. With streaming, peak memory
+should stay roughly constant while the file grows.
+
+Usage: python benchmarks/bench_bulk.py [max_rows] [chunksize]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+
+def write_vehicle_file(path: str, rows: int, seed: int = 0):
+    from bench_training import synthetic_frame
+
+    base = synthetic_frame(1, seed=seed).drop(columns="estimated_resale_value")
+    rng = np.random.default_rng(seed)
+    with open(path, "w", newline="") as f:
+        for start in range(0, rows, 100000):
+            n = min(100000, rows - start)
+            chunk = base.sample(n, replace=True, random_state=int(rng.integers(1 << 31))).reset_index(drop=True)
+            chunk["mileage"] = (chunk["mileage"] * rng.uniform(0.9, 1.1, n)).round()
+            chunk.insert(0, "stock_id", np.arange(start, start + n))
+            chunk.loc[rng.random(n) < 0.001, "year"] = 1990
+            chunk.to_csv(f, index=False, header=start == 0)
+
+
+def child(input_path: str, output_path: str, chunksize: int):
+    """Runs in a fresh interpreter: score the file and print the result with peak RSS."""
+    import functools
+
+    import bulk_scoring
+    import Sale
+
+    current = Sale.warm_up()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    regressor = Sale.load_bulk_regressor(current)
+    result = bulk_scoring.score_file(
+        input_path, output_path, functools.partial(Sale.score_vehicle_chunk, current, regressor=regressor),
+        chunksize=chunksize, output_types=Sale.SCORED_COLUMN_TYPES, rejects_types=Sale.REJECTED_COLUMN_TYPES,
+    )
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result["rss_after_warm_up_mb"] = baseline / 1024
+    print(json.dumps(result))
+
+
+def main(max_rows: int, chunksize: int):
+    rows = max(max_rows // 16, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        while rows <= max_rows:
+            input_path = os.path.join(tmp, f"inventory-{rows}.csv")
+            start = time.perf_counter()
+            write_vehicle_file(input_path, rows)
+            size_mb = os.path.getsize(input_path) / 1e6
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", input_path, os.path.join(tmp, "valued.csv"), str(chunksize)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(output.strip().splitlines()[-1])
+            print(f"rows={r['rows']:>9,} file={size_mb:7.1f} MB scored={r['scored']:>9,} rejected={r['rejected']:>6,} "
+                  f"{r['rows_per_second']:>9,.0f} rows/s peak RSS {r['peak_rss_mb']:6.0f} MB "
+                  f"(after warm-up {r['rss_after_warm_up_mb']:.0f} MB) [generated in {time.perf_counter() - start:.0f} s]")
+            rows *= 4
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000000, int(sys.argv[2]) if len(sys.argv) > 2 else 50000)
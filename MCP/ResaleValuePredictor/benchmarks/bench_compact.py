@@ -0,0 +1,71 @@
+"""Memory against accuracy for the default forest and compact mode.
+
+Both models are trained on the same split of a (replicated, jittered) copy of CSV_DATA.
+For each one the script reports the size of the sklearn forest's arrays, the size of the
+compiled forest the server evaluates (float64 for default models, float32 for compact
+ones), the holdout RMSE and the compiled single-row latency.
+
+Usage: python benchmarks/bench_compact.py [multiplier]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_training import synthetic_frame  # noqa: E402
+from fast_inference import INPUT_FIELDS, compile_pipeline  # noqa: E402
+from sklearn.model_selection import train_test_split  # noqa: E402
+from training import forest_nbytes, train_model_from_csv  # noqa: E402
+
+
+def measure(name, pipeline, test, float32):
+    X_test = test.drop("estimated_resale_value", axis=1)
+    y_test = test["estimated_resale_value"].to_numpy()
+    compiled = compile_pipeline(pipeline, X_test.head(500), float32=float32)
+    rows = list(X_test[list(INPUT_FIELDS)].itertuples(index=False, name=None))[:500]
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        compiled.predict_one(row)
+        latencies.append(time.perf_counter() - start)
+    regressor = pipeline.named_steps["regressor"]
+    return {
+        "model": name,
+        "trees": len(regressor.estimators_),
+        "forest_bytes": forest_nbytes(regressor),
+        "compiled_bytes": compiled.forest.nbytes,
+        "holdout_rmse": round(float(np.sqrt(np.mean((pipeline.predict(X_test) - y_test) ** 2))), 2),
+        "compiled_rmse": round(float(np.sqrt(np.mean((compiled.predict_rows(
+            list(X_test[list(INPUT_FIELDS)].itertuples(index=False, name=None))) - y_test) ** 2))), 2),
+        "latency_us_median": round(statistics.median(latencies) * 1e6, 1),
+        "compaction": getattr(regressor, "compaction_report_", None),
+    }
+
+
+def main(multiplier: int):
+    df = synthetic_frame(multiplier)
+    train, test = train_test_split(df, test_size=0.2, random_state=0)
+    results = [
+        measure("default", train_model_from_csv(train), test, float32=False),
+        measure("compact", train_model_from_csv(train, compact=True), test, float32=True),
+    ]
+    base, compact = results
+    print(f"rows: {len(df)}")
+    for r in results:
+        print(f"{r['model']:<8} trees={r['trees']:>3} forest={r['forest_bytes'] / 1e6:7.2f} MB "
+              f"compiled={r['compiled_bytes'] / 1e6:6.2f} MB holdout RMSE={r['holdout_rmse']:>9} "
+              f"latency={r['latency_us_median']} us")
+    print(f"memory: {base['compiled_bytes'] / compact['compiled_bytes']:.1f}x smaller served forest, "
+          f"RMSE change {compact['holdout_rmse'] - base['holdout_rmse']:+.2f} "
+          f"({(compact['holdout_rmse'] / base['holdout_rmse'] - 1) * 100:+.1f}%)")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
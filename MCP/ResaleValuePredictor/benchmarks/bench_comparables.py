@@ -0,0 +1,63 @@
+"""Comparable-sales lookup: partitioned KD-trees against a linear scan of the DataFrame.
+
+The training data is replicated (with jittered mileage and price) to the requested size.
+Reports the index build time and, for random vehicles, the median and p99 latency of
+ComparableSalesIndex.query and of filtering the DataFrame to the make/model and taking
+the k smallest scaled distances. Both return the same records.
+
+Usage: python benchmarks/bench_comparables.py [multiplier] [k]
+"""
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_batch import sample_vehicles  # noqa: E402
+from bench_training import synthetic_frame  # noqa: E402
+from comparables import FEATURES, ComparableSalesIndex  # noqa: E402
+
+
+def linear_scan(df, scale, v, k):
+    same = df[(df["make"] == v["make"]) & (df["model"] == v["model_name"])]
+    point = np.array([v["year"], v["mileage"], v["original_price"]], dtype=np.float64)
+    distances = np.sqrt((((same[list(FEATURES)].to_numpy(dtype=np.float64) - point) / scale) ** 2).sum(axis=1))
+    return same.iloc[np.argsort(distances, kind="stable")[:k]]
+
+
+def latencies(fn, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples) * 1e6, samples[int(0.99 * (len(samples) - 1))] * 1e6
+
+
+def main(multiplier: int, k: int):
+    df = synthetic_frame(multiplier)
+    index = ComparableSalesIndex.build([df])
+    print(f"rows: {len(df)}, index: {index.report}")
+
+    vehicles = sample_vehicles(300, seed=2)
+    for v in vehicles[:20]:
+        fast = index.query(v["make"], v["model_name"], v["year"], v["mileage"], v["original_price"], k=k)
+        slow = linear_scan(df, index.scale, v, k)
+        assert np.allclose([r["distance"] for r in fast], np.sort(np.sqrt(
+            (((slow[list(FEATURES)].to_numpy(dtype=np.float64)
+               - [v["year"], v["mileage"], v["original_price"]]) / index.scale) ** 2).sum(axis=1))), atol=1e-3)
+
+    tree_median, tree_p99 = latencies(
+        lambda v: index.query(v["make"], v["model_name"], v["year"], v["mileage"], v["original_price"], k=k), vehicles)
+    scan_median, scan_p99 = latencies(lambda v: linear_scan(df, index.scale, v, k), vehicles[:50])
+    print(f"kd-tree      median {tree_median:10.1f} us  p99 {tree_p99:10.1f} us")
+    print(f"linear scan  median {scan_median:10.1f} us  p99 {scan_p99:10.1f} us  ({scan_median / tree_median:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000, int(sys.argv[2]) if len(sys.argv) > 2 else 5)
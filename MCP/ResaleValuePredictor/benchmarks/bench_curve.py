@@ -0,0 +1,55 @@
+"""Depreciation curve: one vectorized call against one estimate_resale_value call per point.
+
+Scores one vehicle at every model year 2000-2023 and every mileage from one step up to
+300k, either by awaiting estimate_resale_value for each point (the prediction cache is
+turned off so every call reaches the model) or with a single depreciation_curve call.
+Age 0 and mileage 0 are left out because estimate_resale_value treats them as missing.
+
+Usage: python benchmarks/bench_curve.py [mileage_step]
+"""
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("RESALE_CACHE_MODE", "off")
+
+import Sale  # noqa: E402
+
+VEHICLE = {"make": "Toyota", "model_name": "Camry", "condition": "Good", "original_price": 25000}
+
+
+async def main(mileage_step: float):
+    Sale.warm_up()
+    years = range(2000, 2024)
+    mileages = np.arange(mileage_step, 300000 + mileage_step / 2, mileage_step)
+
+    start = time.perf_counter()
+    looped = []
+    for year in years:
+        for mileage in mileages:
+            text = await Sale.estimate_resale_value(
+                **VEHICLE, year=year, age=Sale.REFERENCE_YEAR - year, mileage=float(mileage)
+            )
+            looped.append(float(text.rsplit("$", 1)[1]))
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    curve = await Sale.depreciation_curve(
+        **VEHICLE, year_to=2023, mileage_from=mileage_step, mileage_step=mileage_step, format="columns"
+    )
+    curve_seconds = time.perf_counter() - start
+
+    points = len(curve["estimated_resale_value"])
+    assert points == len(looped)
+    assert np.allclose(curve["estimated_resale_value"], looped, atol=0.01)
+    print(f"points:             {points}")
+    print(f"per-point calls:    {loop_seconds:.3f} s")
+    print(f"depreciation_curve: {curve_seconds * 1000:.1f} ms ({loop_seconds / curve_seconds:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 10000))
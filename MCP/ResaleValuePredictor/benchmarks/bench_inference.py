@@ -0,0 +1,60 @@
+"""Check compiled single-row inference against model.predict and compare their latency.
+
+Usage: python benchmarks/bench_inference.py [n_rows]
+"""
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sale  # noqa: E402
+from bench_batch import sample_vehicles  # noqa: E402
+from fast_inference import CompiledPipeline, INPUT_FIELDS  # noqa: E402
+
+
+def percentile(samples, q):
+    return sorted(samples)[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def main(n: int):
+    # The served pipeline may hold only the compiled forest; compare against the sklearn one
+    pipeline = Sale.sklearn_pipeline(Sale.warm_up())
+    if pipeline is None:
+        sys.exit("The served model has no saved artifact to compare against")
+    compiled = CompiledPipeline(pipeline)
+    df = Sale.pd.DataFrame(sample_vehicles(n, seed=1)).rename(columns={"model_name": "model"})
+    rows = list(df[list(INPUT_FIELDS)].itertuples(index=False, name=None))
+
+    # Parity: every row, including makes the encoder has never seen
+    rows.append(("Tesla", "Model 3", 2021, 4, 20000.0, "Good", 45000.0))
+    df = Sale.pd.DataFrame(rows, columns=list(INPUT_FIELDS))
+    expected = pipeline.predict(df)
+    actual = compiled.predict_rows(rows)
+    max_error = float(np.max(np.abs(expected - actual)))
+    assert max_error < 1e-6, f"parity failed: max error {max_error}"
+    print(f"parity:          {len(rows)} rows, max abs error {max_error:.2e}")
+
+    sklearn_times, compiled_times = [], []
+    for i, row in enumerate(rows[:n]):
+        start = time.perf_counter()
+        pipeline.predict(df.iloc[[i]])
+        sklearn_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        compiled.predict_one(row)
+        compiled_times.append(time.perf_counter() - start)
+
+    for name, times in (("model.predict", sklearn_times), ("compiled", compiled_times)):
+        print(
+            f"{name + ':':<16} median {statistics.median(times) * 1e6:,.0f} us, "
+            f"p99 {percentile(times, 0.99) * 1e6:,.0f} us"
+        )
+    print(f"speedup:         {statistics.median(sklearn_times) / statistics.median(compiled_times):.1f}x (median)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,73 @@
+"""Added latency of prediction intervals over point predictions.
+
+Compares, for single rows and for a batch:
+    point       the compiled forest's mean prediction
+    quantiles   mean plus P10/P90 from all tree outputs in one vectorized pass
+    per-tree    asking each sklearn tree separately (what intervals would cost naively)
+
+Usage: python benchmarks/bench_intervals.py [n_rows]
+"""
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sale  # noqa: E402
+from bench_batch import sample_vehicles  # noqa: E402
+from fast_inference import INPUT_FIELDS, quantile_summary  # noqa: E402
+
+QUANTILES = [0.1, 0.9]
+
+
+def median_us(fn, items):
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def per_tree(pipeline, rows):
+    X = pipeline.named_steps["preprocessor"].transform(Sale.pd.DataFrame(rows, columns=list(INPUT_FIELDS)))
+    outputs = np.stack([tree.predict(X) for tree in pipeline.named_steps["regressor"].estimators_], axis=1)
+    return outputs.mean(axis=1), np.quantile(outputs, QUANTILES, axis=1).T
+
+
+def main(n: int):
+    current = Sale.warm_up()
+    if current.compiled is None:
+        sys.exit("Compiled inference is unavailable for this model")
+    rows = [tuple(v[f] for f in Sale.BATCH_FIELDS) for v in sample_vehicles(n)]
+    compiled = current.compiled
+    pipeline = Sale.sklearn_pipeline(current)
+    if pipeline is None:
+        sys.exit("The served model has no saved artifact with sklearn trees")
+
+    point = median_us(lambda r: compiled.predict_rows([r]), rows[:500])
+    quantiles = median_us(lambda r: quantile_summary(compiled.tree_outputs([r]), QUANTILES), rows[:500])
+    naive = median_us(lambda r: per_tree(pipeline, [r]), rows[:50])
+    print(f"trees: {len(compiled.forest.roots)}")
+    print(f"single row  point {point:8.1f} us | quantiles {quantiles:8.1f} us (+{quantiles - point:.1f} us) "
+          f"| per-tree {naive:9.1f} us")
+
+    start = time.perf_counter()
+    compiled.predict_rows(rows)
+    point_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    means, _ = quantile_summary(compiled.tree_outputs(rows), QUANTILES)
+    quantile_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    naive_means, _ = per_tree(pipeline, rows)
+    naive_batch = time.perf_counter() - start
+    assert np.allclose(means, naive_means)
+    print(f"{n} rows   point {point_batch * 1000:8.1f} ms | quantiles {quantile_batch * 1000:8.1f} ms "
+          f"(+{(quantile_batch - point_batch) * 1000:.1f} ms) | per-tree {naive_batch * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,101 @@
+"""Compare the trie-based prompt parser with the original regex parser: throughput and accuracy.
+
+Prompts are generated from random vehicles in several phrasings, so each parser's
+output can be checked field by field against the vehicle it describes.
+
+Usage: python benchmarks/bench_parser.py [n_prompts]
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sale  # noqa: E402
+from bench_batch import sample_vehicles  # noqa: E402
+
+TEMPLATES = [
+    "What's the resale value of a {year} {make} {model} in {condition} condition with {mileage:,} mileage, "
+    "originally bought for ${price:,}?",
+    "I have a {year} {make} {model}, {condition_lower} condition, {mileage_k}k miles, paid ${price:,}",
+    "{make} {model} {year} {condition_lower} {mileage} miles {price} dollars",
+    "my {year} {model} is in {condition_lower} shape with mileage of {mileage:,}, price was {price:,}",
+]
+FIELDS = ["make", "model_name", "year", "mileage", "condition", "original_price"]
+
+
+def legacy_parse(prompt: str):
+    """The parser this benchmark replaced, kept verbatim for comparison."""
+    result = {"make": None, "model_name": None, "year": None, "age": None,
+              "mileage": None, "condition": None, "original_price": None}
+    year_match = re.search(r'(\d{4})', prompt)
+    if year_match:
+        result["year"] = int(year_match.group(1))
+        result["age"] = 2024 - result["year"]
+    make_model_match = re.search(r'(\w+)\s+(\w+)', prompt)
+    if make_model_match:
+        result["make"] = make_model_match.group(1)
+        result["model_name"] = make_model_match.group(2)
+    condition_match = re.search(r'(poor|fair|good|excellent)', prompt.lower())
+    if condition_match:
+        result["condition"] = condition_match.group(1).capitalize()
+    mileage_match = re.search(r'(\d+(?:,\d+)*)\s*mileage', prompt)
+    if mileage_match:
+        result["mileage"] = float(mileage_match.group(1).replace(',', ''))
+    price_match = re.search(r'(\d+(?:,\d+)*)\s*(?:dollars|dollar|\$)?', prompt)
+    if price_match:
+        result["original_price"] = float(price_match.group(1).replace(',', ''))
+    return result
+
+
+def make_prompts(n: int):
+    prompts, truth = [], []
+    for i, v in enumerate(sample_vehicles(n, seed=1)):
+        mileage = v["mileage"] // 1000 * 1000
+        prompts.append(TEMPLATES[i % len(TEMPLATES)].format(
+            year=v["year"], make=v["make"], model=v["model_name"], condition=v["condition"],
+            condition_lower=v["condition"].lower(), mileage=mileage, mileage_k=mileage // 1000,
+            price=v["original_price"],
+        ))
+        truth.append({**v, "mileage": mileage})
+    return prompts, truth
+
+
+def accuracy(parsed, truth):
+    """Fraction of prompts where every field was recovered, and per-field hit rates."""
+    per_field = {f: sum(p[f] == t[f] for p, t in zip(parsed, truth)) / len(truth) for f in FIELDS}
+    complete = sum(all(p[f] == t[f] for f in FIELDS) for p, t in zip(parsed, truth)) / len(truth)
+    return complete, per_field
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(n: int):
+    prompts, truth = make_prompts(n)
+    parser = Sale.warm_up().parser
+
+    legacy, legacy_seconds = timed(lambda: [legacy_parse(p) for p in prompts])
+    single, single_seconds = timed(lambda: [parser.parse(p) for p in prompts])
+    batch, batch_seconds = timed(lambda: parser.parse_many(prompts))
+    # Repeated prompts are parsed once by parse_many
+    repeated = prompts[: max(1, n // 10)] * 10
+    _, repeated_seconds = timed(lambda: parser.parse_many(repeated))
+    assert batch == single
+
+    print(f"prompts:              {n}")
+    for name, seconds in [("legacy regex", legacy_seconds), ("trie parse", single_seconds),
+                          ("trie parse_many", batch_seconds), ("parse_many, 10x dupes", repeated_seconds)]:
+        print(f"{name:<22}{seconds:.3f} s ({n / seconds:,.0f} prompts/s)")
+    for name, parsed in [("legacy regex", legacy), ("trie parser", single)]:
+        complete, per_field = accuracy(parsed, truth)
+        fields = ", ".join(f"{f} {rate:.0%}" for f, rate in per_field.items())
+        print(f"{name:<22}all fields correct {complete:.1%} ({fields})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,73 @@
+"""Report forest fit time against the number of cores and the size of the training set.
+
+Larger training sets are made by replicating CSV_DATA with jittered mileage and price.
+
+Usage: python benchmarks/bench_training.py [max_multiplier]
+"""
+import json
+import os
+import sys
+import time
+from io import StringIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sale  # noqa: E402
+from training import add_trees, train_model_from_csv  # noqa: E402
+
+
+def synthetic_frame(multiplier: int, seed: int = 0):
+    base = Sale.pd.read_csv(StringIO(Sale.CSV_DATA))
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(multiplier):
+        jitter = base.copy()
+        jitter["mileage"] = (jitter["mileage"] * rng.uniform(0.9, 1.1, len(jitter))).round()
+        jitter["original_price"] = (jitter["original_price"] * rng.uniform(0.95, 1.05, len(jitter))).round()
+        frames.append(jitter)
+    return Sale.pd.concat(frames, ignore_index=True)
+
+
+def fit_seconds(df, n_jobs: int) -> float:
+    # A DataFrame source has no fingerprint, so the preprocessor cache is bypassed and
+    # every run pays the full preprocessing + fit cost
+    start = time.perf_counter()
+    train_model_from_csv(df, n_jobs=n_jobs)
+    return time.perf_counter() - start
+
+
+def main(max_multiplier: int):
+    cpus = os.cpu_count() or 1
+    core_counts = sorted({1, *[c for c in (2, 4, 8, 16, 32) if c < cpus], cpus})
+    results = {"cpus": cpus, "by_cores": [], "by_rows": []}
+
+    df = synthetic_frame(max(1, max_multiplier // 4))
+    for cores in core_counts:
+        seconds = fit_seconds(df, cores)
+        results["by_cores"].append({"rows": len(df), "n_jobs": cores, "fit_seconds": round(seconds, 3)})
+        print(f"rows={len(df):>8} n_jobs={cores:>3} fit={seconds:.3f} s")
+
+    multiplier = 1
+    while multiplier <= max_multiplier:
+        df = synthetic_frame(multiplier)
+        seconds = fit_seconds(df, -1)
+        results["by_rows"].append({"rows": len(df), "n_jobs": cpus, "fit_seconds": round(seconds, 3)})
+        print(f"rows={len(df):>8} n_jobs={cpus:>3} fit={seconds:.3f} s")
+        multiplier *= 4
+
+    # Adding trees to an existing forest versus refitting it on the combined data
+    base, extra = synthetic_frame(1), synthetic_frame(1, seed=1)
+    start = time.perf_counter()
+    add_trees(Sale.sklearn_pipeline(Sale.warm_up()), extra, n_new_trees=20)
+    warm = time.perf_counter() - start
+    full = fit_seconds(Sale.pd.concat([base, extra], ignore_index=True), -1)
+    results["warm_start"] = {"add_20_trees_seconds": round(warm, 3), "full_refit_seconds": round(full, 3)}
+    print(f"warm start +20 trees: {warm:.3f} s, full refit: {full:.3f} s")
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
@@ -0,0 +1,263 @@
+"""Score vehicle files of any size in bounded memory.
+
+A reader thread reads the input CSV/Parquet file in chunks. The calling thread validates
+and scores each chunk, and a writer thread appends the results and the rejected rows to
+their output files. The stages are connected by queues of at most queue_depth chunks,
+so reading, scoring and writing overlap, and only a fixed number of chunks are held in
+memory however long the file is. Outputs are written to .tmp files and renamed into
+place only when the whole input has been scored.
+
+Usage: python bulk_scoring.py inventory.csv valued.csv [--rejects rejected.csv] [--chunksize 50000]
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from data_source import iter_chunks
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+def default_rejects_path(output_path: str) -> str:
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.rejects{ext or '.csv'}"
+
+
+def describe_progress(progress: Dict[str, Any]) -> str:
+    return (f"{progress['rows']:,} rows ({progress['scored']:,} scored, {progress['rejected']:,} rejected) "
+            f"in {progress['seconds']:.1f} s, {progress['rows_per_second']:,.0f} rows/s")
+
+
+class ChunkWriter:
+    """Appends DataFrame chunks to path + ".tmp" as CSV or Parquet; commit() renames it to path.
+
+    A Parquet file has one schema, fixed when the first chunk is written. column_types
+    gives the Arrow type names (such as "string" or "double") of columns whose type must
+    not depend on the values in that chunk. Other columns keep the first chunk's types,
+    except that all-missing ones are stored as strings. Every chunk is cast to the
+    schema, since pandas types chunks independently (a column with a missing value
+    comes in as float64 after an int64 chunk).
+    """
+
+    def __init__(self, path: str, column_types: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.parquet = path.endswith((".parquet", ".pq"))
+        self.column_types = column_types or {}
+        self.file = None
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Writing Parquet output requires pyarrow (pip install pyarrow)") from e
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.tmp_path, self._schema(pa, table.schema))
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            header = self.file is None
+            if header:
+                self.file = open(self.tmp_path, "w", newline="")
+            df.to_csv(self.file, index=False, header=header)
+        self.rows += len(df)
+
+    def _schema(self, pa, inferred):
+        fields = []
+        for field in inferred:
+            if field.name in self.column_types:
+                field = field.with_type(pa.type_for_alias(self.column_types[field.name]))
+            elif pa.types.is_null(field.type):
+                field = field.with_type(pa.string())
+            fields.append(field)
+        # The pandas metadata describes the first chunk's dtypes only, so it is left out
+        return pa.schema(fields)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.file is not None:
+            self.file.close()
+
+    def commit(self):
+        self.close()
+        if self.file is None and self.writer is None:
+            # No chunks at all: still leave an (empty) output behind
+            open(self.tmp_path, "w").close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put item on a bounded queue, giving up (False) once stop is set."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Next item from the queue, or _DONE once stop is set."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def score_file(
+    input_path: str,
+    output_path: str,
+    score_chunk: Callable[[pd.DataFrame], Tuple[pd.DataFrame, pd.DataFrame]],
+    rejects_path: Optional[str] = None,
+    chunksize: int = 50000,
+    queue_depth: int = 2,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    progress_interval: float = 5.0,
+    output_types: Optional[Dict[str, str]] = None,
+    rejects_types: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """Stream input_path through score_chunk into output_path and rejects_path.
+
+    score_chunk receives each chunk with its index set to the input row numbers and
+    returns (scored rows, rejected rows). progress, if given, is called from the
+    scoring thread at most every progress_interval seconds and once at the end.
+    output_types and rejects_types are the column_types of the two ChunkWriters.
+    Returns the final counts and throughput.
+    """
+    rejects_path = rejects_path or default_rejects_path(output_path)
+    paths = {os.path.abspath(p) for p in (output_path, rejects_path)}
+    if os.path.abspath(input_path) in paths or len(paths) < 2:
+        raise ValueError("Input, output and rejects files must all be different")
+    if chunksize < 1 or queue_depth < 1:
+        raise ValueError("chunksize and queue_depth must be positive")
+
+    read_queue, write_queue = queue.Queue(queue_depth), queue.Queue(queue_depth)
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        try:
+            for chunk in iter_chunks(input_path, chunksize, downcast_types=False):
+                if not _put(read_queue, chunk, stop):
+                    return
+            _put(read_queue, _DONE, stop)
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+
+    def write():
+        results, rejects = ChunkWriter(output_path, output_types), ChunkWriter(rejects_path, rejects_types)
+        try:
+            while True:
+                item = _get(write_queue, stop)
+                if item is _DONE:
+                    break
+                scored, rejected = item
+                results.write(scored)
+                rejects.write(rejected)
+            if stop.is_set():
+                results.discard()
+                rejects.discard()
+            else:
+                results.commit()
+                rejects.commit()
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+            results.discard()
+            rejects.discard()
+
+    reader = threading.Thread(target=read, name="bulk-scoring-reader", daemon=True)
+    writer = threading.Thread(target=write, name="bulk-scoring-writer", daemon=True)
+    reader.start()
+    writer.start()
+
+    counts = {"rows": 0, "scored": 0, "rejected": 0, "chunks": 0}
+    start = last_report = time.perf_counter()
+
+    def snapshot():
+        seconds = time.perf_counter() - start
+        return {**counts, "seconds": round(seconds, 3),
+                "rows_per_second": round(counts["rows"] / seconds, 1) if seconds else 0.0}
+
+    try:
+        while True:
+            chunk = _get(read_queue, stop)
+            if chunk is _DONE:
+                break
+            chunk.index = pd.RangeIndex(counts["rows"], counts["rows"] + len(chunk))
+            scored, rejected = score_chunk(chunk)
+            if not _put(write_queue, (scored, rejected), stop):
+                break
+            counts["rows"] += len(chunk)
+            counts["scored"] += len(scored)
+            counts["rejected"] += len(rejected)
+            counts["chunks"] += 1
+            if progress is not None and time.perf_counter() - last_report >= progress_interval:
+                progress(snapshot())
+                last_report = time.perf_counter()
+        _put(write_queue, _DONE, stop)
+    except BaseException as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        reader.join()
+        writer.join()
+    if errors:
+        raise errors[0]
+
+    result = snapshot()
+    if progress is not None:
+        progress(result)
+    return {**result, "output_path": output_path, "rejects_path": rejects_path}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every vehicle in a CSV/Parquet file with the resale model.")
+    parser.add_argument("input", help="CSV or Parquet file with make, model (or model_name), year, age, "
+                                      "mileage, condition and original_price columns")
+    parser.add_argument("output", help="where to write the scored rows (.csv or .parquet)")
+    parser.add_argument("--rejects", help="where to write rejected rows (default: <output>.rejects.<ext>)")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--queue-depth", type=int, default=2, help="chunks buffered between stages")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    import Sale
+    current = Sale.warm_up()
+    result = score_file(
+        args.input, args.output, functools.partial(Sale.score_vehicle_chunk, current),
+        rejects_path=args.rejects, chunksize=args.chunksize, queue_depth=args.queue_depth,
+        progress=lambda p: logger.info(describe_progress(p)), progress_interval=args.progress_interval,
+        output_types=Sale.SCORED_COLUMN_TYPES, rejects_types=Sale.REJECTED_COLUMN_TYPES,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
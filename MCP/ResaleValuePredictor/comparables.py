@@ -0,0 +1,156 @@
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+# Distances are measured over these, each divided by its standard deviation in the data
+FEATURES = ("year", "mileage", "original_price")
+RECORD_COLUMNS = ["make", "model", "year", "age", "mileage", "condition", "original_price", "estimated_resale_value"]
+# Stored as int32 codes into a small array of names rather than as one string per record
+CATEGORY_COLUMNS = ("make", "model", "condition")
+# Resident bytes per indexed record: the encoded columns (44), the KD-tree's scaled points
+# (24) and its index array (8), rounded up for the tree nodes
+RECORD_BYTES = 80
+
+
+def _encode(values: pd.Series, codes: Dict[str, int]) -> np.ndarray:
+    """Codes of values in `codes` (name -> code), adding names not seen before."""
+    inverse, uniques = pd.factorize(values.astype(str))
+    mapping = np.array([codes.setdefault(name, len(codes)) for name in uniques], dtype=np.int32)
+    return mapping[inverse]
+
+
+class ComparableSalesIndex:
+    """Nearest historical sales to a vehicle, partitioned by make/model.
+
+    Records are sorted by make/model so each partition is a contiguous slice of the
+    column arrays, and every partition gets its own KD-tree over the scaled year,
+    mileage and original price. A query touches one dict lookup and one tree, so its
+    cost depends on the size of that partition's tree, not on the number of records.
+
+    Every per-record array, the trees' included, is a NumPy array, so processes that
+    load the index with joblib's mmap_mode share one copy.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], categories: Dict[str, np.ndarray],
+                 partitions: Dict[tuple, tuple], scale: np.ndarray, leaf_size: int):
+        self.columns = columns
+        # Names of the codes in the make, model and condition columns
+        self.categories = categories
+        # (make, model) casefolded -> (start, stop, KDTree) of its slice of the columns
+        self.partitions = partitions
+        self.scale = scale
+        self.leaf_size = leaf_size
+        # Identifies the records indexed, so an unchanged data set can reuse the index
+        self.fingerprint: Optional[str] = None
+        self.report: Dict[str, Any] = {}
+
+    @classmethod
+    def build(cls, chunks: Iterable[pd.DataFrame], leaf_size: int = 40, memory_budget_mb: float = None,
+              seed: int = 42) -> "ComparableSalesIndex":
+        """Index every complete record in `chunks` (DataFrames with RECORD_COLUMNS).
+
+        When the records would take more than memory_budget_mb, a uniform random sample
+        that fits is indexed instead (bottom-k on a random key per record, as in
+        data_source.load_training_frame).
+        """
+        start = time.perf_counter()
+        capacity = None if memory_budget_mb is None else max(int(memory_budget_mb * 1024 * 1024 // RECORD_BYTES), 1)
+        rng = np.random.default_rng(seed)
+        codes = {field: {} for field in CATEGORY_COLUMNS}
+        parts: List[Dict[str, np.ndarray]] = []
+        kept = records_read = 0
+        for chunk in chunks:
+            chunk = chunk[RECORD_COLUMNS].dropna()
+            records_read += len(chunk)
+            part = {field: _encode(chunk[field], codes[field]) for field in CATEGORY_COLUMNS}
+            part.update({
+                "year": chunk["year"].to_numpy(dtype=np.int32),
+                "age": chunk["age"].to_numpy(dtype=np.int32),
+                "mileage": chunk["mileage"].to_numpy(dtype=np.float64),
+                "original_price": chunk["original_price"].to_numpy(dtype=np.float64),
+                "estimated_resale_value": chunk["estimated_resale_value"].to_numpy(dtype=np.float64),
+            })
+            if capacity is not None:
+                part["_key"] = rng.random(len(chunk))
+            parts.append(part)
+            kept += len(chunk)
+            if capacity is not None and kept > capacity:
+                merged = {field: np.concatenate([p[field] for p in parts]) for field in parts[0]}
+                keep = np.argpartition(merged["_key"], capacity - 1)[:capacity]
+                parts = [{field: values[keep] for field, values in merged.items()}]
+                kept = capacity
+
+        columns = {field: np.concatenate([p[field] for p in parts]) if parts else np.empty(0)
+                   for field in RECORD_COLUMNS}
+        categories = {field: np.array(list(codes[field]), dtype=object) for field in CATEGORY_COLUMNS}
+
+        # Partitions ignore case: fold each distinct name once, then combine make and model codes
+        make_folds, make_keys = pd.factorize(pd.Series(categories["make"], dtype=object).str.casefold())
+        model_folds, model_keys = pd.factorize(pd.Series(categories["model"], dtype=object).str.casefold())
+        pairs = make_folds[columns["make"].astype(np.int64)] * max(len(model_keys), 1) \
+            + model_folds[columns["model"].astype(np.int64)]
+        pair_codes, pair_values = pd.factorize(pairs)
+        keys = [(make_keys[value // max(len(model_keys), 1)], model_keys[value % max(len(model_keys), 1)])
+                for value in pair_values]
+        order = np.argsort(pair_codes, kind="stable")
+        pair_codes = pair_codes[order]
+        columns = {field: values[order] for field, values in columns.items()}
+
+        points = np.column_stack([columns[f] for f in FEATURES]).astype(np.float64)
+        scale = points.std(axis=0) if len(points) else np.ones(len(FEATURES))
+        scale[scale == 0] = 1.0
+        points /= scale
+
+        partitions = {}
+        bounds = np.searchsorted(pair_codes, np.arange(len(keys) + 1))
+        for code, key in enumerate(keys):
+            lo, hi = bounds[code], bounds[code + 1]
+            # Each tree keeps its slice of points rather than a copy
+            partitions[key] = (lo, hi, KDTree(points[lo:hi], leaf_size=leaf_size))
+
+        index = cls(columns, categories, partitions, scale, leaf_size)
+        sizes = np.diff(bounds)
+        index.report = {
+            "records": int(len(pair_codes)),
+            "records_read": records_read,
+            "partitions": len(partitions),
+            "largest_partition": int(sizes.max()) if len(sizes) else 0,
+            "mb": round(index.nbytes / 1e6, 1),
+            "build_seconds": round(time.perf_counter() - start, 3),
+        }
+        return index
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [*self.columns.values(), *(a for _, _, tree in self.partitions.values() for a in tree.get_arrays())]
+        return int(sum(np.asarray(a).nbytes for a in arrays))
+
+    def query(self, make, model_name, year, mileage, original_price, k: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """The k records of this make/model closest in year, mileage and price, nearest first.
+
+        Returns None when there are no sales of this make/model.
+        """
+        partition = self.partitions.get((str(make).casefold(), str(model_name).casefold()))
+        if partition is None:
+            return None
+        start, stop, tree = partition
+        point = np.array([[year, mileage, original_price]], dtype=np.float64) / self.scale
+        distances, indices = tree.query(point, k=min(k, stop - start))
+        columns, categories = self.columns, self.categories
+        results = []
+        for distance, i in zip(distances[0], indices[0] + start):
+            results.append({
+                "make": categories["make"][columns["make"][i]],
+                "model": categories["model"][columns["model"][i]],
+                "year": int(columns["year"][i]),
+                "age": int(columns["age"][i]),
+                "mileage": float(columns["mileage"][i]),
+                "condition": categories["condition"][columns["condition"][i]],
+                "original_price": float(columns["original_price"][i]),
+                "estimated_resale_value": float(columns["estimated_resale_value"][i]),
+                "distance": round(float(distance), 4),
+            })
+        return results
@@ -0,0 +1,165 @@
+import logging
+import os
+from io import StringIO
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_COLUMNS = ["make", "model", "condition"]
+INT_COLUMNS = ["year", "age"]
+FLOAT_COLUMNS = ["mileage", "original_price", "estimated_resale_value"]
+
+# Rows are grouped on these when aggregating to fit a memory budget
+AGGREGATE_KEYS = ["make", "model", "year", "age", "condition", "mileage_bucket", "price_bucket"]
+
+TrainingSource = Union[str, os.PathLike, pd.DataFrame, List[Any], Iterable[pd.DataFrame]]
+
+
+def is_inline_csv(source) -> bool:
+    """Inline CSV text (like Sale.CSV_DATA) rather than a path."""
+    return isinstance(source, str) and "\n" in source
+
+
+def iter_chunks(
+    source: TrainingSource, chunksize: int = 100000, columns: Optional[List[str]] = None, downcast_types: bool = True
+) -> Iterator[pd.DataFrame]:
+    """Yield downcast DataFrame chunks from inline CSV text, a CSV/Parquet path, a DataFrame,
+    a list of any of those, or an iterator of DataFrames.
+
+    With downcast_types=False chunks are yielded as read, e.g. for input whose values still
+    need validating.
+    """
+    if isinstance(source, (list, tuple)):
+        for part in source:
+            yield from iter_chunks(part, chunksize, columns, downcast_types)
+        return
+    if isinstance(source, pd.DataFrame):
+        chunks = (source.iloc[i:i + chunksize] for i in range(0, len(source), chunksize))
+    elif is_inline_csv(source):
+        chunks = pd.read_csv(StringIO(source), chunksize=chunksize, usecols=columns)
+    elif isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if path.endswith((".parquet", ".pq")):
+            chunks = _iter_parquet(path, chunksize, columns)
+        else:
+            chunks = pd.read_csv(path, chunksize=chunksize, usecols=columns)
+    else:
+        chunks = iter(source)
+
+    for chunk in chunks:
+        if columns is not None:
+            chunk = chunk[columns]
+        yield downcast(chunk) if downcast_types else chunk
+
+
+def _iter_parquet(path: str, chunksize: int, columns: Optional[List[str]]) -> Iterator[pd.DataFrame]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Reading Parquet training data requires pyarrow (pip install pyarrow)") from e
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def downcast(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Categorical make/model/condition, int32 year/age, float32 everything else numeric."""
+    chunk = chunk.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in chunk:
+            chunk[col] = chunk[col].astype("category")
+    for col in INT_COLUMNS:
+        if col in chunk:
+            chunk[col] = pd.to_numeric(chunk[col], downcast="integer").astype(np.int32)
+    for col in FLOAT_COLUMNS:
+        if col in chunk:
+            chunk[col] = pd.to_numeric(chunk[col]).astype(np.float32)
+    return chunk
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    # Categoricals with different categories concatenate to object; re-categorize afterwards
+    df = pd.concat(frames, ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _aggregate(df: pd.DataFrame, mileage_bucket: float, price_bucket: float) -> pd.DataFrame:
+    """Collapse rows that share make/model/year/age/condition and mileage/price buckets into weighted means."""
+    work = df.assign(
+        mileage_bucket=(df["mileage"] // mileage_bucket).astype(np.int32),
+        price_bucket=(df["original_price"] // price_bucket).astype(np.int32),
+    )
+    for col in ["mileage", "original_price", "estimated_resale_value"]:
+        work[col] = work[col] * work["weight"]
+    grouped = work.groupby(AGGREGATE_KEYS, observed=True, sort=False)[
+        ["mileage", "original_price", "estimated_resale_value", "weight"]
+    ].sum().reset_index()
+    for col in ["mileage", "original_price", "estimated_resale_value"]:
+        grouped[col] = (grouped[col] / grouped["weight"]).astype(np.float32)
+    return downcast(grouped.drop(columns=["mileage_bucket", "price_bucket"]))
+
+
+def load_training_frame(
+    source: TrainingSource,
+    memory_budget_mb: float = 512.0,
+    strategy: str = "subsample",
+    chunksize: int = 100000,
+    mileage_bucket: float = 5000.0,
+    price_bucket: float = 1000.0,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """Stream the source into one downcast frame that stays within memory_budget_mb.
+
+    When the rows would exceed the budget, "subsample" keeps a uniform random sample
+    (bottom-k on a random key per row) and "aggregate" collapses similar rows into
+    weighted means, adding a "weight" column to pass as sample_weight.
+    """
+    if strategy not in ("subsample", "aggregate"):
+        raise ValueError("strategy must be 'subsample' or 'aggregate'")
+    budget = memory_budget_mb * 1024 * 1024
+    rng = np.random.default_rng(seed)
+    frames: List[pd.DataFrame] = []
+    size = 0
+    rows_read = 0
+    reduced = False
+
+    for chunk in iter_chunks(source, chunksize):
+        rows_read += len(chunk)
+        if strategy == "subsample":
+            chunk = chunk.assign(_key=rng.random(len(chunk)))
+        else:
+            chunk = chunk.assign(weight=np.float32(1.0))
+        frames.append(chunk)
+        size += chunk.memory_usage(deep=True).sum()
+        if size <= budget:
+            continue
+
+        reduced = True
+        kept = _concat(frames)
+        if strategy == "subsample":
+            capacity = max(int(len(kept) * budget / size), 1)
+            kept = kept.nsmallest(capacity, "_key")
+        else:
+            kept = _aggregate(kept, mileage_bucket, price_bucket)
+        frames = [kept]
+        size = kept.memory_usage(deep=True).sum()
+        if strategy == "aggregate" and size > budget:
+            raise MemoryError(
+                f"Aggregated training data still exceeds {memory_budget_mb} MB; "
+                "raise the budget, widen the buckets or use strategy='subsample'"
+            )
+
+    if not frames:
+        raise ValueError("Training data source is empty")
+    kept = _concat(frames).drop(columns=["_key"], errors="ignore")
+    if reduced:
+        logger.info(f"Training data reduced by {strategy} from {rows_read} to {len(kept)} rows to fit {memory_budget_mb} MB")
+    else:
+        kept = kept.drop(columns=["weight"], errors="ignore")
+    return kept
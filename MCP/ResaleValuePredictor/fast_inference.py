@@ -0,0 +1,235 @@
+import logging
+import time
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+
+logger = logging.getLogger(__name__)
+
+# Input tuple layout for predict_one/predict_rows
+INPUT_FIELDS = ("make", "model", "year", "age", "mileage", "condition", "original_price")
+
+
+class CompiledForest:
+    """Random forest flattened into contiguous node arrays, evaluated for all trees at once.
+
+    Leaves point back to themselves with an infinite threshold, so every tree can be
+    stepped exactly max_depth times without checking whether it has already finished.
+
+    With float32=True thresholds and leaf values are stored as float32 and node indices
+    as int32, halving the footprint. Thresholds are rounded down, which keeps every split
+    decision identical (features are compared as float32 anyway); only leaf values lose
+    precision, by well under a cent at resale-price magnitudes.
+    """
+
+    def __init__(self, forest, float32: bool = False):
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            ids = np.arange(n, dtype=np.int64) + offset
+            is_leaf = tree.children_left == -1
+            lefts.append(np.where(is_leaf, ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        index_type = np.int32 if float32 else np.int64
+        threshold = np.concatenate(thresholds)
+        if float32:
+            # Round down so x <= threshold gives the same answer for every float32 x
+            rounded = threshold.astype(np.float32)
+            too_high = rounded > threshold
+            rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+            threshold = rounded
+        self.left = np.ascontiguousarray(np.concatenate(lefts), dtype=index_type)
+        self.right = np.ascontiguousarray(np.concatenate(rights), dtype=index_type)
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=index_type)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32 if float32 else np.float64)
+        self.value = np.ascontiguousarray(np.concatenate(values), dtype=np.float32 if float32 else np.float64)
+        self.roots = np.asarray(roots, dtype=index_type)
+        self.max_depth = max_depth
+        self.n_features = forest.n_features_in_
+
+    def leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """Per-tree outputs with shape (n_rows, n_trees)."""
+        # sklearn compares float32 features against float64 thresholds; do the same for parity
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.leaf_values(X).mean(axis=1, dtype=np.float64)
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(a.nbytes for a in (self.left, self.right, self.feature, self.threshold, self.value, self.roots)))
+
+
+class CompiledPipeline:
+    """Inference path for the fitted OneHotEncoder/StandardScaler/RandomForest pipeline.
+
+    Rows are plain tuples in INPUT_FIELDS order; no DataFrame or ColumnTransformer is involved.
+    """
+
+    def __init__(self, pipeline, float32: bool = False):
+        preprocessor = pipeline.named_steps["preprocessor"]
+        regressor = pipeline.named_steps["regressor"]
+        if not hasattr(regressor, "estimators_"):
+            raise ValueError(f"Cannot compile regressor of type {type(regressor).__name__}")
+
+        # Output column layout follows transformers_ order: one-hot blocks first, then scaled numerics
+        self.category_columns = []  # (input position, {category: output column})
+        self.numeric_columns = []   # (input position, output column, mean, scale)
+        column = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if name == "remainder":
+                if transformer != "drop":
+                    raise ValueError("Cannot compile a ColumnTransformer that passes through columns")
+                continue
+            if name == "cat":
+                for field, categories in zip(columns, transformer.categories_):
+                    mapping = {category: column + i for i, category in enumerate(categories)}
+                    self.category_columns.append((INPUT_FIELDS.index(field), mapping))
+                    column += len(categories)
+            elif name == "num":
+                for field, mean, scale in zip(columns, transformer.mean_, transformer.scale_):
+                    self.numeric_columns.append((INPUT_FIELDS.index(field), column, float(mean), float(scale)))
+                    column += 1
+            else:
+                raise ValueError(f"Cannot compile transformer {name!r}")
+
+        self.n_features = column
+        self.forest = CompiledForest(regressor, float32=float32)
+        if self.forest.n_features != self.n_features:
+            raise ValueError("Preprocessor output width does not match the forest's input width")
+
+    def transform_rows(self, rows: Sequence[Tuple]) -> np.ndarray:
+        X = np.zeros((len(rows), self.n_features), dtype=np.float64)
+        for r, row in enumerate(rows):
+            for position, mapping in self.category_columns:
+                # Unknown categories encode as all zeros, as with handle_unknown="ignore"
+                col = mapping.get(row[position])
+                if col is not None:
+                    X[r, col] = 1.0
+            for position, col, mean, scale in self.numeric_columns:
+                X[r, col] = (row[position] - mean) / scale
+        return X
+
+    def transform_columns(self, columns: Dict[str, Any]) -> np.ndarray:
+        """transform_rows for whole columns: INPUT_FIELDS -> equal-length arrays, or scalars that are broadcast."""
+        n = max((len(v) for v in columns.values() if np.ndim(v)), default=1)
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+        for position, mapping in self.category_columns:
+            values = columns[INPUT_FIELDS[position]]
+            if np.ndim(values) == 0:
+                col = mapping.get(values)
+                if col is not None:
+                    X[:, col] = 1.0
+                continue
+            # Map each distinct category once rather than every row
+            uniques, inverse = np.unique(np.asarray(values, dtype=object), return_inverse=True)
+            cols = np.array([mapping.get(u, -1) for u in uniques], dtype=np.int64)[inverse]
+            known = np.flatnonzero(cols >= 0)
+            X[known, cols[known]] = 1.0
+        for position, col, mean, scale in self.numeric_columns:
+            X[:, col] = (np.asarray(columns[INPUT_FIELDS[position]], dtype=np.float64) - mean) / scale
+        return X
+
+    def predict_rows(self, rows: Sequence[Tuple]) -> np.ndarray:
+        return self.forest.predict(self.transform_rows(rows))
+
+    def tree_outputs(self, rows: Sequence[Tuple]) -> np.ndarray:
+        return self.forest.leaf_values(self.transform_rows(rows))
+
+    def predict_one(self, row: Tuple) -> float:
+        return float(self.forest.predict(self.transform_rows((row,)))[0])
+
+
+class CompiledRegressor(RegressorMixin, BaseEstimator):
+    """Stand-in for the fitted forest inside a Pipeline, backed by a CompiledForest.
+
+    Used by processes that map a shared compiled model instead of unpickling their own
+    copy of the sklearn trees. Prediction only; it cannot be refit.
+    """
+
+    def __init__(self, forest: CompiledForest):
+        self.forest = forest
+        self.n_features_in_ = forest.n_features
+
+    def fit(self, X, y=None):
+        raise NotImplementedError("CompiledRegressor is prediction-only")
+
+    def predict(self, X) -> np.ndarray:
+        # The one-hot ColumnTransformer output may be sparse
+        if hasattr(X, "toarray"):
+            X = X.toarray()
+        return self.forest.predict(X)
+
+
+def serving_pipeline(preprocessor, forest: CompiledForest, **attributes):
+    """Pipeline of the fitted preprocessor and a CompiledRegressor, holding no sklearn trees.
+
+    attributes (such as compaction_report_) are copied onto the regressor.
+    """
+    from sklearn.pipeline import Pipeline
+
+    regressor = CompiledRegressor(forest)
+    for name, value in attributes.items():
+        setattr(regressor, name, value)
+    return Pipeline([("preprocessor", preprocessor), ("regressor", regressor)])
+
+
+def quantile_summary(tree_outputs: np.ndarray, quantiles: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean and quantiles across trees of (n_rows, n_trees) outputs; quantiles come back as (n_rows, len(quantiles))."""
+    means = tree_outputs.mean(axis=1, dtype=np.float64)
+    # Same linear interpolation as np.quantile, without its per-call overhead on small inputs
+    ordered = np.sort(tree_outputs, axis=1).astype(np.float64, copy=False)
+    position = np.asarray(quantiles, dtype=np.float64) * (ordered.shape[1] - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, ordered.shape[1] - 1)
+    fraction = position - lower
+    bounds = ordered[:, lower] * (1 - fraction) + ordered[:, upper] * fraction
+    return means, bounds
+
+
+def compile_pipeline(pipeline, sample_df=None, tolerance: float = None, float32: bool = False):
+    """Compile the pipeline, checking parity against pipeline.predict on sample_df.
+
+    Returns None when the pipeline cannot be compiled or the parity check fails, so
+    callers can fall back to pipeline.predict. The default tolerance is 1e-6, or one
+    cent with float32 leaf values.
+    """
+    if tolerance is None:
+        tolerance = 0.01 if float32 else 1e-6
+    start = time.perf_counter()
+    try:
+        compiled = CompiledPipeline(pipeline, float32=float32)
+    except (ValueError, KeyError, AttributeError) as e:
+        logger.info(f"Compiled inference unavailable, using pipeline.predict: {e}")
+        return None
+
+    if sample_df is not None and len(sample_df):
+        rows = list(sample_df[list(INPUT_FIELDS)].itertuples(index=False, name=None))
+        max_error = float(np.max(np.abs(compiled.predict_rows(rows) - pipeline.predict(sample_df))))
+        if max_error > tolerance:
+            logger.warning(f"Compiled inference disagrees with pipeline.predict (max error {max_error}); not using it")
+            return None
+
+    logger.info(
+        f"Compiled inference ready in {(time.perf_counter() - start) * 1000:.1f} ms "
+        f"({len(compiled.forest.value)} nodes, depth {compiled.forest.max_depth}, "
+        f"{compiled.forest.nbytes / 1e6:.1f} MB{' float32' if float32 else ''})"
+    )
+    return compiled
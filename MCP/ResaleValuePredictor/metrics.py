@@ -0,0 +1,134 @@
+import bisect
+import collections
+import random
+import threading
+import time
+from typing import Any, Dict
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels), from 5 us to 5 s
+BUCKETS = (
+    5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"),
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; observing is a bisect and three additions under a lock."""
+
+    __slots__ = ("counts", "total", "count", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += seconds
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (an overestimate of at most one bucket)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return BUCKETS[-1]
+
+
+class StageTimer:
+    """Times consecutive stages of one request: each mark() records the time since the previous one."""
+
+    __slots__ = ("metrics", "start", "last")
+
+    def __init__(self, metrics: "Metrics"):
+        self.metrics = metrics
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self.metrics.observe(stage, now - self.last)
+        self.last = now
+
+    def finish(self, stage: str = "total"):
+        self.metrics.observe(stage, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """Stands in for StageTimer on unsampled requests."""
+
+    __slots__ = ()
+
+    def mark(self, stage: str):
+        pass
+
+    def finish(self, stage: str = "total"):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Per-stage latency histograms and error counters.
+
+    timer() returns a no-op timer for requests that are not sampled, so unsampled requests
+    pay only for one random() call; with sample_rate=1.0 every request is timed.
+    """
+
+    def __init__(self, namespace: str, sample_rate: float = 1.0):
+        self.namespace = namespace
+        self.sample_rate = sample_rate
+        self.histograms: Dict[str, LatencyHistogram] = collections.defaultdict(LatencyHistogram)
+        self.errors: Dict[str, int] = collections.Counter()
+        self._lock = threading.Lock()
+
+    def timer(self):
+        if self.sample_rate >= 1.0 or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return StageTimer(self)
+        return NULL_TIMER
+
+    def observe(self, stage: str, seconds: float):
+        self.histograms[stage].observe(seconds)
+
+    def count_error(self, kind: str):
+        with self._lock:
+            self.errors[kind] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        stages = {}
+        for stage, h in sorted(self.histograms.items()):
+            stages[stage] = {
+                "count": h.count,
+                "mean_ms": round(h.total / h.count * 1000, 4) if h.count else 0.0,
+                "p50_ms_le": h.quantile(0.50) * 1000,
+                "p99_ms_le": h.quantile(0.99) * 1000,
+            }
+        return {"sample_rate": self.sample_rate, "stages": stages, "errors": dict(self.errors)}
+
+    def prometheus_text(self) -> str:
+        name = f"{self.namespace}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Latency of each request stage.",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, h in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.total}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+        errors = f"{self.namespace}_errors_total"
+        lines += [f"# HELP {errors} Failed requests by error type.", f"# TYPE {errors} counter"]
+        for kind, n in sorted(self.errors.items()):
+            lines.append(f'{errors}{{type="{kind}"}} {n}')
+        return "\n".join(lines) + "\n"
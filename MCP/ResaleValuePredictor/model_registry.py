@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import joblib
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+# Artifacts live next to the server unless RESALE_MODEL_DIR says otherwise
+MODEL_DIR = os.environ.get(
+    "RESALE_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+)
+
+# Files are hashed in blocks of this size, so large training files are never read whole
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def training_fingerprint(source, params: Dict[str, Any]) -> Optional[str]:
+    """Hash of the training data, hyperparameters and sklearn version.
+
+    Inline CSV text and files are hashed by content, so a file edited in place changes the
+    fingerprint whatever its modification time; a list of sources combines its members'
+    hashes. Other sources (DataFrame iterators) cannot be fingerprinted and return None.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, (list, tuple)):
+        parts = [training_fingerprint(part, {}) for part in source]
+        if None in parts:
+            return None
+        digest.update(",".join(parts).encode("utf-8"))
+    elif isinstance(source, str) and "\n" in source:
+        digest.update(source.encode("utf-8"))
+    elif isinstance(source, (str, os.PathLike)) and os.path.isfile(source):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+    else:
+        return None
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(sklearn.__version__.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def artifact_paths(fingerprint: str, model_dir: str = MODEL_DIR) -> Dict[str, str]:
+    base = os.path.join(model_dir, f"resale-{fingerprint}")
+    return {"model": base + ".joblib", "meta": base + ".json"}
+
+
+def save_model(pipeline, fingerprint: str, meta: Dict[str, Any], model_dir: str = MODEL_DIR) -> str:
+    """Write the fitted pipeline uncompressed (required for mmap) plus a metadata sidecar."""
+    os.makedirs(model_dir, exist_ok=True)
+    paths = artifact_paths(fingerprint, model_dir)
+    # Write to temp files and rename so a concurrent loader never sees a partial artifact
+    tmp_model = paths["model"] + f".tmp{os.getpid()}"
+    joblib.dump(pipeline, tmp_model)
+    os.replace(tmp_model, paths["model"])
+    tmp_meta = paths["meta"] + f".tmp{os.getpid()}"
+    with open(tmp_meta, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_meta, paths["meta"])
+    return paths["model"]
+
+
+def load_model(fingerprint: str, model_dir: str = MODEL_DIR):
+    """Load a saved pipeline with its arrays memory-mapped read-only, or return None."""
+    paths = artifact_paths(fingerprint, model_dir)
+    if not os.path.exists(paths["model"]):
+        return None
+    try:
+        return joblib.load(paths["model"], mmap_mode="r")
+    except Exception as e:
+        logger.warning(f"Could not load model artifact {paths['model']}: {e}")
+        return None
+
+
+def read_meta(fingerprint: str, model_dir: str = MODEL_DIR) -> Optional[Dict[str, Any]]:
+    paths = artifact_paths(fingerprint, model_dir)
+    try:
+        with open(paths["meta"]) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def preprocessed_path(fingerprint: str, model_dir: str = MODEL_DIR) -> str:
+    return os.path.join(model_dir, f"preprocessed-{fingerprint}.joblib")
+
+
+def load_preprocessed(fingerprint: str, model_dir: str = MODEL_DIR) -> Optional[Dict[str, Any]]:
+    """Load a cached fitted preprocessor with its transformed training matrix, or return None."""
+    path = preprocessed_path(fingerprint, model_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path, mmap_mode="r")
+    except Exception as e:
+        logger.warning(f"Could not load preprocessed data {path}: {e}")
+        return None
+
+
+def save_preprocessed(fingerprint: str, payload: Dict[str, Any], model_dir: str = MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    path = preprocessed_path(fingerprint, model_dir)
+    tmp = path + f".tmp{os.getpid()}"
+    try:
+        joblib.dump(payload, tmp)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not cache preprocessed data {path}: {e}")
+
+
+def delete_artifacts(fingerprints: Iterable[str] = (), preprocessed: Iterable[str] = (),
+                     model_dir: str = MODEL_DIR) -> int:
+    """Remove saved models and cached preprocessed data by fingerprint; returns the number of files removed."""
+    paths = [path for fingerprint in fingerprints for path in artifact_paths(fingerprint, model_dir).values()]
+    paths += [preprocessed_path(fingerprint, model_dir) for fingerprint in preprocessed]
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+    return removed
+
+
+def load_or_train(
+    csv_data,
+    train_fn: Callable[..., Any],
+    params: Dict[str, Any],
+    model_dir: str = MODEL_DIR,
+):
+    """Return (pipeline, metadata) for this data/params, training and saving only on a hash miss.
+
+    Note that sklearn copies tree nodes into its own buffers when unpickling, so the
+    memory-mapped pages are shared between processes only for arrays that stay NumPy arrays.
+    """
+    fingerprint = training_fingerprint(csv_data, params)
+    if fingerprint is None:
+        logger.info("Training data source has no fingerprint; training without the model registry")
+        start = time.perf_counter()
+        pipeline = train_fn(csv_data, **params)
+        return pipeline, {"fingerprint": None, "params": params, "fit_seconds": time.perf_counter() - start}
+
+    start = time.perf_counter()
+    pipeline = load_model(fingerprint, model_dir)
+    if pipeline is not None:
+        load_seconds = time.perf_counter() - start
+        meta = read_meta(fingerprint, model_dir) or {"fingerprint": fingerprint}
+        fit_seconds = meta.get("fit_seconds")
+        if fit_seconds:
+            logger.info(
+                f"Loaded model {fingerprint} in {load_seconds * 1000:.1f} ms "
+                f"(training took {fit_seconds * 1000:.1f} ms, {fit_seconds / load_seconds:.1f}x faster)"
+            )
+        else:
+            logger.info(f"Loaded model {fingerprint} in {load_seconds * 1000:.1f} ms")
+        return pipeline, meta
+
+    start = time.perf_counter()
+    pipeline = train_fn(csv_data, **params)
+    fit_seconds = time.perf_counter() - start
+    meta = {
+        "fingerprint": fingerprint,
+        "params": params,
+        "sklearn_version": sklearn.__version__,
+        "fit_seconds": fit_seconds,
+        "created_at": time.time(),
+    }
+    try:
+        path = save_model(pipeline, fingerprint, meta, model_dir)
+        logger.info(f"Trained model {fingerprint} in {fit_seconds * 1000:.1f} ms, saved to {path}")
+    except OSError as e:
+        logger.warning(f"Trained model {fingerprint} but could not save it: {e}")
+    return pipeline, meta
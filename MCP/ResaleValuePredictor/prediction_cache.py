@@ -0,0 +1,98 @@
+import collections
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class PredictionCache:
+    """Bounded LRU cache with TTL for predictions keyed on vehicle features.
+
+    By default the key is the row itself and the row is scored as given, so a cached
+    answer is the one the model would give. With bucketed=True, mileage and original price are quantized and
+    nearby vehicles share one entry: the model is evaluated on the bucket midpoint, so
+    every answer, cached or not, is approximate. Entries belong to a model version;
+    bumping the version drops them all.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 3600.0,
+        bucketed: bool = False,
+        mileage_bucket: float = 5000.0,
+        price_bucket: float = 1000.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.bucketed = bucketed
+        self.mileage_bucket = mileage_bucket
+        self.price_bucket = price_bucket
+        self.model_version: Optional[Hashable] = None
+        self._entries: "collections.OrderedDict[Hashable, Tuple[float, float]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def normalize(self, row: Tuple) -> Tuple[Hashable, Tuple]:
+        """Return (cache key, row to evaluate) for a (make, model, year, age, mileage, condition, price) row."""
+        # Names are not case-folded: the model encodes "honda" and "Honda" differently
+        if not self.bucketed:
+            return tuple(row), row
+        make, model_name, year, age, mileage, condition, original_price = row
+        mileage_index = int(mileage // self.mileage_bucket)
+        price_index = int(original_price // self.price_bucket)
+        key = (make, model_name, year, age, mileage_index, condition, price_index)
+        mileage = (mileage_index + 0.5) * self.mileage_bucket
+        original_price = (price_index + 0.5) * self.price_bucket
+        return key, (make, model_name, year, age, mileage, condition, original_price)
+
+    def get(self, key: Hashable) -> Optional[float]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: float, model_version: Optional[Hashable] = None):
+        with self._lock:
+            # A prediction computed by a model that has since been replaced is not stored
+            if model_version is not None and model_version != self.model_version:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_model_version(self, version: Hashable):
+        """Drop every entry if the model changed."""
+        with self._lock:
+            if version != self.model_version:
+                self._entries.clear()
+                self.model_version = version
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "mode": "bucketed" if self.bucketed else "exact",
+            "approximate": self.bucketed,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "model_version": self.model_version,
+        }
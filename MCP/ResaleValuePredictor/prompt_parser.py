@@ -0,0 +1,164 @@
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Union
+
+# Age is counted from this year, matching the original prompt parser
+REFERENCE_YEAR = 2024
+
+CONDITIONS = {"poor": "Poor", "fair": "Fair", "good": "Good", "excellent": "Excellent"}
+MILEAGE_WORDS = frozenset({"mileage", "miles", "mile", "mi", "odometer"})
+PRICE_SUFFIXES = frozenset({"dollars", "dollar", "usd", "bucks"})
+PRICE_WORDS = frozenset({"price", "priced", "paid", "cost", "costs", "msrp", "bought", "purchased", "sticker"})
+
+# Words the parser reacts to: conditions, units that label the number before them, and
+# keywords that label the next number
+KEYWORDS = {
+    **{word: ("condition", condition) for word, condition in CONDITIONS.items()},
+    **{word: ("context", "mileage") for word in ("odometer",)},
+    **{word: ("context", "original_price") for word in PRICE_WORDS},
+    **{word: ("unit", "original_price") for word in PRICE_SUFFIXES},
+    **{word: ("unit", "mileage") for word in MILEAGE_WORDS - {"odometer"}},
+}
+
+# One token per match on the case-folded prompt: a word, or an optionally $-prefixed number
+# (1,234 / 12.5 / 80k). No capture groups, so findall returns plain strings.
+TOKEN = re.compile(r"[a-z][a-z0-9-]*|\$?\d[\d,]*(?:\.\d+)?(?: ?k\b)?")
+
+# Trie key marking the end of a name; tokens are never empty, and a string survives pickling
+_END = ""
+
+
+class PromptParser:
+    """Single-pass parser for prompts like "2018 Honda Civic, good condition, 80k miles, paid $22,000".
+
+    The prompt is tokenized once. Makes and models are matched against a token trie built
+    from the categories the model was trained on (longest match wins, so "Grand Cherokee"
+    beats "Cherokee"), and numbers are labelled from the token that follows them ("miles",
+    "dollars") or the keyword before them ("paid", "mileage"). A plain four-digit number is
+    the year; numbers left unlabelled fill mileage, then price.
+    """
+
+    def __init__(self, makes: Iterable[str], models: Iterable[str], model_makes: Optional[Mapping[str, str]] = None):
+        self.trie: Dict = {}
+        for kind, names in (("make", makes), ("model_name", models)):
+            for name in names:
+                node = self.trie
+                # Hyphens are dropped so "F-150" and "f150" match
+                for token in TOKEN.findall(str(name).casefold()):
+                    node = node.setdefault(token.replace("-", ""), {})
+                node[_END] = (kind, str(name))
+        # model -> make, so "my 2018 Civic" still finds Honda
+        self.model_makes = dict(model_makes or {})
+
+    @classmethod
+    def from_pipeline(cls, pipeline, sample=None) -> "PromptParser":
+        """Build from the fitted OneHotEncoder; `sample` (a training frame) supplies model -> make."""
+        encoder = pipeline.named_steps["preprocessor"].named_transformers_["cat"]
+        makes, models = encoder.categories_[0], encoder.categories_[1]
+        model_makes = None
+        if sample is not None:
+            pairs = sample[["make", "model"]].astype(str).drop_duplicates()
+            # Only models that belong to a single make can be used to infer it
+            unique = pairs.drop_duplicates("model", keep=False)
+            model_makes = dict(zip(unique["model"], unique["make"]))
+        return cls(makes, models, model_makes)
+
+    def parse(self, prompt: str) -> Dict[str, Union[str, int, float, None]]:
+        result = {
+            "make": None,
+            "model_name": None,
+            "year": None,
+            "age": None,
+            "mileage": None,
+            "condition": None,
+            "original_price": None
+        }
+        tokens = TOKEN.findall(prompt.casefold())
+        keys = [token.replace("-", "") for token in tokens]
+        trie = self.trie
+        leftover = []
+        context = None  # "mileage" or "original_price" after a keyword like "mileage of" / "paid"
+        i, n = 0, len(tokens)
+        while i < n:
+            key = keys[i]
+            node = trie.get(key)
+            if node is not None:
+                # Longest make/model phrase starting here
+                j, match = i + 1, node.get(_END)
+                end = j
+                while j < n:
+                    node = node.get(keys[j])
+                    if node is None:
+                        break
+                    j += 1
+                    if _END in node:
+                        match, end = node[_END], j
+                if match is not None:
+                    kind, name = match
+                    if result[kind] is None:
+                        result[kind] = name
+                    i = end
+                    continue
+
+            token = tokens[i]
+            i += 1
+            if token[0].isalpha():
+                action = KEYWORDS.get(key)
+                if action is None:
+                    continue
+                if action[0] == "condition":
+                    if result["condition"] is None:
+                        result["condition"] = action[1]
+                else:
+                    # A keyword or a unit word without a number before it ("mileage of 80,000")
+                    context = action[1]
+                continue
+
+            dollar = token[0] == "$"
+            k = token[-1] == "k"
+            num = token.lstrip("$").rstrip("k ").replace(",", "")
+            value = float(num)
+            if k:
+                value *= 1000
+            unit = KEYWORDS.get(keys[i]) if i < n else None
+            if unit is not None and unit[0] != "unit":
+                unit = None
+            if dollar:
+                field = "original_price"
+            elif unit is not None:
+                field = unit[1]
+            elif context is not None and result[context] is None:
+                field = context
+            elif (result["year"] is None and len(token) == 4 and token.isdigit()
+                  and 1900 <= value <= 2099):
+                field = "year"
+            else:
+                leftover.append(value)
+                continue
+            if unit is not None:
+                i += 1  # the unit word was consumed with its number
+            if result[field] is None:
+                result[field] = int(value) if field == "year" else value
+            context = None
+
+        for value in leftover:
+            if result["mileage"] is None:
+                result["mileage"] = value
+            elif result["original_price"] is None:
+                result["original_price"] = value
+        if result["year"] is not None:
+            result["age"] = REFERENCE_YEAR - result["year"]
+        if result["make"] is None and result["model_name"] is not None:
+            result["make"] = self.model_makes.get(result["model_name"])
+        return result
+
+    def parse_many(self, prompts: Iterable[str]) -> List[Dict[str, Union[str, int, float, None]]]:
+        """Parse many prompts; repeated prompts are parsed once."""
+        parse = self.parse
+        seen: Dict[str, Dict] = {}
+        results = []
+        for prompt in prompts:
+            parsed = seen.get(prompt)
+            if parsed is None:
+                parsed = seen[prompt] = parse(prompt)
+            results.append(dict(parsed))
+        return results
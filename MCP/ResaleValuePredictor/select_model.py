@@ -0,0 +1,205 @@
+"""Cross-validated search over forest hyperparameters, weighing accuracy against serving cost.
+
+Every combination of n_estimators, max_depth and min_samples_leaf is scored with K-fold
+CV in a process pool. The ColumnTransformer is fit once per fold and its output is
+shared with every worker through memory-mapped joblib files. Each candidate is then
+refit on the training split, and its holdout RMSE, single-row latency (the compiled
+path the server uses) and size are measured. The report lists the cheapest
+candidate that meets --rmse-budget.
+
+Usage:
+    python select_model.py --n-estimators 25 50 100 --max-depth 8 16 none \\
+        --min-samples-leaf 1 3 --rmse-budget 3000 --report-dir reports
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import pickle
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.pipeline import Pipeline
+
+from data_source import load_training_frame
+from fast_inference import INPUT_FIELDS, CompiledPipeline
+from training import make_preprocessor
+
+logger = logging.getLogger(__name__)
+
+
+def cache_transforms(X, y, folds: int, cache_dir: str, seed: int) -> List[str]:
+    """Fit the preprocessor once per fold and dump the transformed splits for the workers."""
+    paths = []
+    for i, (train_idx, val_idx) in enumerate(KFold(folds, shuffle=True, random_state=seed).split(X)):
+        preprocessor = make_preprocessor()
+        payload = {
+            "X_train": preprocessor.fit_transform(X.iloc[train_idx]),
+            "y_train": y[train_idx],
+            "X_val": preprocessor.transform(X.iloc[val_idx]),
+            "y_val": y[val_idx],
+        }
+        path = os.path.join(cache_dir, f"fold-{i}.joblib")
+        joblib.dump(payload, path)
+        paths.append(path)
+    return paths
+
+
+def evaluate_candidate(params: Dict[str, Any], fold_paths: List[str], seed: int) -> Dict[str, Any]:
+    """Cross-validated RMSE and fit time of one hyperparameter combination (runs in a worker)."""
+    rmses, fit_seconds = [], []
+    for path in fold_paths:
+        fold = joblib.load(path, mmap_mode="r")
+        regressor = RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+        start = time.perf_counter()
+        regressor.fit(fold["X_train"], fold["y_train"])
+        fit_seconds.append(time.perf_counter() - start)
+        rmses.append(float(np.sqrt(mean_squared_error(fold["y_val"], regressor.predict(fold["X_val"])))))
+    return {
+        "params": params,
+        "cv_rmse": round(statistics.mean(rmses), 2),
+        "cv_rmse_std": round(statistics.pstdev(rmses), 2),
+        "fit_seconds": round(statistics.mean(fit_seconds), 4),
+    }
+
+
+def measure_serving_cost(params, X_train, y_train, X_test, y_test, seed: int, n_latency_rows: int = 200) -> Dict[str, Any]:
+    """Refit on the training split, then measure holdout RMSE, single-row latency and size."""
+    pipeline = Pipeline([
+        ("preprocessor", make_preprocessor()),
+        ("regressor", RandomForestRegressor(random_state=seed, n_jobs=1, **params)),
+    ])
+    pipeline.fit(X_train, y_train)
+    compiled = CompiledPipeline(pipeline)
+
+    rows = list(X_test[list(INPUT_FIELDS)].itertuples(index=False, name=None))[:n_latency_rows]
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        compiled.predict_one(row)
+        latencies.append(time.perf_counter() - start)
+
+    forest = compiled.forest
+    return {
+        "holdout_rmse": round(float(np.sqrt(mean_squared_error(y_test, pipeline.predict(X_test)))), 2),
+        "latency_us_median": round(statistics.median(latencies) * 1e6, 1),
+        "nodes": int(len(forest.value)),
+        "model_bytes": len(pickle.dumps(pipeline.named_steps["regressor"], protocol=pickle.HIGHEST_PROTOCOL)),
+        "compiled_bytes": int(sum(a.nbytes for a in (forest.left, forest.right, forest.feature, forest.threshold, forest.value))),
+    }
+
+
+def write_report(results: List[Dict[str, Any]], recommended, report_dir: str):
+    os.makedirs(report_dir, exist_ok=True)
+    with open(os.path.join(report_dir, "model_selection.json"), "w") as f:
+        json.dump({"candidates": results, "recommended": recommended}, f, indent=2)
+
+    lines = [
+        "| n_estimators | max_depth | min_samples_leaf | CV RMSE | holdout RMSE | latency (us) | size (KB) |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for r in sorted(results, key=lambda r: r["latency_us_median"]):
+        p = r["params"]
+        lines.append(
+            f"| {p['n_estimators']} | {p['max_depth']} | {p['min_samples_leaf']} | {r['cv_rmse']} "
+            f"| {r['holdout_rmse']} | {r['latency_us_median']} | {r['model_bytes'] // 1024} |"
+        )
+    with open(os.path.join(report_dir, "model_selection.md"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        logger.info("matplotlib not installed; skipping the accuracy/latency plot")
+        return
+    fig, ax = plt.subplots(figsize=(8, 5))
+    sizes = np.array([r["model_bytes"] for r in results], dtype=float)
+    ax.scatter(
+        [r["latency_us_median"] for r in results],
+        [r["cv_rmse"] for r in results],
+        s=40 + 400 * sizes / sizes.max(),
+        alpha=0.6,
+    )
+    for r in results:
+        p = r["params"]
+        ax.annotate(f"{p['n_estimators']}/{p['max_depth']}/{p['min_samples_leaf']}",
+                    (r["latency_us_median"], r["cv_rmse"]), fontsize=7)
+    ax.set_xlabel("single-row latency (us, median)")
+    ax.set_ylabel("CV RMSE")
+    ax.set_title("Accuracy vs latency (marker area ~ model size)")
+    fig.tight_layout()
+    fig.savefig(os.path.join(report_dir, "model_selection.png"), dpi=120)
+
+
+def parse_depth(value: str):
+    return None if value.lower() == "none" else int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--data", help="CSV/Parquet training file (default: the server's training data)")
+    parser.add_argument("--n-estimators", type=int, nargs="+", default=[25, 50, 100])
+    parser.add_argument("--max-depth", type=parse_depth, nargs="+", default=[8, 16, None])
+    parser.add_argument("--min-samples-leaf", type=int, nargs="+", default=[1, 3])
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--rmse-budget", type=float, help="Highest acceptable CV RMSE")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--report-dir", default="reports")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.data is None:
+        from Sale import training_sources
+        source = training_sources()
+    else:
+        source = args.data
+    df = load_training_frame(source)
+    df = df.drop(columns=["weight"], errors="ignore")
+    X = df.drop("estimated_resale_value", axis=1)
+    y = df["estimated_resale_value"].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=args.test_size, random_state=args.seed)
+
+    grid = [
+        {"n_estimators": n, "max_depth": d, "min_samples_leaf": leaf}
+        for n, d, leaf in itertools.product(args.n_estimators, args.max_depth, args.min_samples_leaf)
+    ]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fold_paths = cache_transforms(X_train, y_train, args.folds, cache_dir, args.seed)
+        logger.info(f"Evaluating {len(grid)} candidates x {args.folds} folds on {args.workers} workers")
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(evaluate_candidate, grid, itertools.repeat(fold_paths), itertools.repeat(args.seed)))
+
+    # Serving cost is measured one candidate at a time so latencies aren't skewed by the pool
+    for result in results:
+        result.update(measure_serving_cost(result["params"], X_train, y_train, X_test, y_test, args.seed))
+        logger.info(f"{result}")
+
+    eligible = [r for r in results if args.rmse_budget is None or r["cv_rmse"] <= args.rmse_budget]
+    recommended = min(eligible, key=lambda r: (r["latency_us_median"], r["model_bytes"])) if eligible else None
+    write_report(results, recommended, args.report_dir)
+
+    if recommended is None:
+        print(f"No candidate meets the RMSE budget of {args.rmse_budget}; best CV RMSE is {min(r['cv_rmse'] for r in results)}")
+        return
+    p = recommended["params"]
+    print(f"Recommended: {p} (CV RMSE {recommended['cv_rmse']}, {recommended['latency_us_median']} us, "
+          f"{recommended['model_bytes'] // 1024} KB)")
+    print(f"Serve it with RESALE_N_ESTIMATORS={p['n_estimators']} "
+          f"RESALE_MAX_DEPTH={p['max_depth'] or ''} RESALE_MIN_SAMPLES_LEAF={p['min_samples_leaf']}")
+
+
+if __name__ == "__main__":
+    main()
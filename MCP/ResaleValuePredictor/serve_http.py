@@ -0,0 +1,206 @@
+"""Serve the resale MCP server over HTTP from several worker processes sharing one model.
+
+The parent loads (or trains) the model once, writes it out with Sale.export_shared_model
+and binds the listening socket. Each worker is a spawned process that memory-maps that
+file (RESALE_SHARED_MODEL), so the compiled forest and grid exist once in the page
+cache however many workers there are, and runs the streamable HTTP app on the shared
+socket with uvicorn. Workers are stateless (no MCP sessions, JSON responses), so any
+worker can answer any request.
+
+Every worker records its pid, request and error counts, in-flight requests and a
+heartbeat in a shared array. GET /health on any worker returns the whole table, the
+parent logs per-worker throughput every --report-interval seconds and restarts workers
+that die. On SIGINT/SIGTERM the parent stops restarting workers and sends them SIGTERM;
+uvicorn stops accepting connections and gives in-flight requests --graceful-timeout
+seconds before the parent kills what is left.
+
+Usage: python serve_http.py --workers 4 --port 8000
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from model_registry import MODEL_DIR
+
+logger = logging.getLogger(__name__)
+
+# Per-worker slots in the shared stats array
+STATS_FIELDS = ("pid", "started_at", "heartbeat", "requests", "errors", "in_flight")
+PID, STARTED_AT, HEARTBEAT, REQUESTS, ERRORS, IN_FLIGHT = range(len(STATS_FIELDS))
+
+
+def worker_table(stats, workers: int):
+    now = time.time()
+    table = []
+    for slot in range(workers):
+        base = slot * len(STATS_FIELDS)
+        row = dict(zip(STATS_FIELDS, stats[base:base + len(STATS_FIELDS)]))
+        table.append({
+            "slot": slot,
+            "pid": int(row["pid"]),
+            "uptime_seconds": round(now - row["started_at"], 1) if row["started_at"] else None,
+            "heartbeat_age_seconds": round(now - row["heartbeat"], 1) if row["heartbeat"] else None,
+            "requests": int(row["requests"]),
+            "errors": int(row["errors"]),
+            "in_flight": int(row["in_flight"]),
+        })
+    return table
+
+
+class WorkerStats:
+    """ASGI middleware that counts this worker's requests and serves GET /health."""
+
+    def __init__(self, app, stats, slot: int, workers: int, model_version: str):
+        self.app = app
+        self.stats = stats
+        self.base = slot * len(STATS_FIELDS)
+        self.slot = slot
+        self.workers = workers
+        self.model_version = model_version
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"] == "/health":
+            body = json.dumps({
+                "served_by": self.slot,
+                "model_version": self.model_version,
+                "workers": worker_table(self.stats, self.workers),
+            }).encode("utf-8")
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # Only this worker writes its slot, so no lock is needed
+        stats, base = self.stats, self.base
+        stats[base + IN_FLIGHT] += 1
+        status = 500
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            stats[base + IN_FLIGHT] -= 1
+            stats[base + REQUESTS] += 1
+            if status >= 500:
+                stats[base + ERRORS] += 1
+
+
+def worker_main(slot: int, sock: socket.socket, stats, workers: int, graceful_timeout: float):
+    # Own process group, so a Ctrl-C in the terminal reaches only the parent, which then
+    # shuts workers down with a single SIGTERM
+    os.setpgrp()
+    logging.basicConfig(level=logging.WARNING)
+    import uvicorn
+
+    import Sale
+    # Map RESALE_SHARED_MODEL (set by the parent) before accepting connections
+    Sale.warm_up()
+
+    base = slot * len(STATS_FIELDS)
+    for field in range(len(STATS_FIELDS)):
+        stats[base + field] = 0
+    stats[base + PID] = os.getpid()
+    stats[base + STARTED_AT] = stats[base + HEARTBEAT] = time.time()
+
+    def heartbeat():
+        while True:
+            stats[base + HEARTBEAT] = time.time()
+            time.sleep(1.0)
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    Sale.mcp.settings.stateless_http = True
+    Sale.mcp.settings.json_response = True
+    app = WorkerStats(Sale.mcp.streamable_http_app(), stats, slot, workers, Sale.served.version)
+    config = uvicorn.Config(app, log_level="warning", timeout_graceful_shutdown=graceful_timeout)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--report-interval", type=float, default=30.0, help="seconds between throughput log lines")
+    parser.add_argument("--graceful-timeout", type=float, default=10.0,
+                        help="seconds in-flight requests get to finish on shutdown")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    import Sale
+    Sale.warm_up()
+    shared_path = os.path.join(MODEL_DIR, f"shared-{Sale.served.version}.joblib")
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    Sale.export_shared_model(Sale.served, shared_path)
+    os.environ["RESALE_SHARED_MODEL"] = shared_path
+    logger.info(f"Exported shared model to {shared_path} ({os.path.getsize(shared_path) / 1e6:.1f} MB)")
+
+    sock = socket.create_server((args.host, args.port), backlog=2048)
+    ctx = multiprocessing.get_context("spawn")
+    stats = ctx.RawArray("d", args.workers * len(STATS_FIELDS))
+
+    def start(slot):
+        process = ctx.Process(target=worker_main, name=f"resale-worker-{slot}",
+                              args=(slot, sock, stats, args.workers, args.graceful_timeout))
+        process.start()
+        return process
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    processes = [start(slot) for slot in range(args.workers)]
+    restarts = [0] * args.workers
+    logger.info(f"Serving on http://{args.host}:{args.port}/mcp with {args.workers} workers (GET /health for status)")
+
+    last_report, last_requests = time.monotonic(), [0] * args.workers
+    while not stopping.wait(0.5):
+        for slot, process in enumerate(processes):
+            if not process.is_alive():
+                logger.warning(f"Worker {slot} (pid {process.pid}) exited with code {process.exitcode}; restarting")
+                restarts[slot] += 1
+                last_requests[slot] = 0
+                processes[slot] = start(slot)
+        if time.monotonic() - last_report >= args.report_interval:
+            elapsed = time.monotonic() - last_report
+            for row in worker_table(stats, args.workers):
+                slot = row["slot"]
+                rate = (row["requests"] - last_requests[slot]) / elapsed
+                last_requests[slot] = row["requests"]
+                logger.info(
+                    f"worker {slot} pid {row['pid']}: {rate:.1f} req/s, {row['requests']} requests, "
+                    f"{row['errors']} errors, {row['in_flight']} in flight, "
+                    f"heartbeat {row['heartbeat_age_seconds']} s ago, {restarts[slot]} restarts"
+                )
+            last_report = time.monotonic()
+
+    logger.info("Shutting down: waiting for in-flight requests")
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + args.graceful_timeout + 5
+    for process in processes:
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            logger.warning(f"Worker pid {process.pid} did not stop in time; killing it")
+            process.kill()
+            process.join()
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
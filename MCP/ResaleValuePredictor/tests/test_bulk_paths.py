@@ -0,0 +1,40 @@
+import asyncio
+import os
+
+import pytest
+
+import Sale
+
+
+@pytest.fixture
+def bulk_dir(tmp_path, monkeypatch):
+    root = tmp_path / "bulk"
+    root.mkdir()
+    monkeypatch.setattr(Sale, "BULK_DIR", str(root))
+    return root
+
+
+def test_relative_paths_resolve_inside_bulk_dir(bulk_dir):
+    assert Sale.bulk_path("in/cars.csv") == str(bulk_dir.resolve() / "in" / "cars.csv")
+    assert Sale.bulk_path(str(bulk_dir / "cars.csv")) == str(bulk_dir.resolve() / "cars.csv")
+
+
+@pytest.mark.parametrize("path", ["../cars.csv", "/etc/passwd", "in/../../cars.csv"])
+def test_paths_outside_bulk_dir_are_refused(bulk_dir, path):
+    with pytest.raises(ValueError):
+        Sale.bulk_path(path)
+
+
+def test_symlink_out_of_bulk_dir_is_refused(bulk_dir, tmp_path):
+    os.symlink(tmp_path, bulk_dir / "escape")
+    with pytest.raises(ValueError):
+        Sale.bulk_path("escape/cars.csv")
+
+
+def test_tool_does_not_write_outside_bulk_dir(bulk_dir, tmp_path):
+    (bulk_dir / "cars.csv").write_text("make,model,year,age,mileage,condition,original_price\n")
+    target = tmp_path / "victim.csv"
+    target.write_text("keep me")
+    result = asyncio.run(Sale.score_vehicle_file("cars.csv", str(target)))
+    assert "outside the bulk scoring directory" in result["error"]
+    assert target.read_text() == "keep me"
@@ -0,0 +1,44 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+import Sale
+
+pytest.importorskip("pyarrow")
+
+VALID = ["Toyota,Camry,2018,6,60000,Good,25000", "Honda,Civic,2019,5,45000,Excellent,22000"]
+INVALID = ["Toyota,Camry,1990,34,60000,Good,25000", "Honda,Civic,2019,5,many,Good,22000",
+           "Ford,F-150,2020,4,30000,Mint,40000"]
+
+
+@pytest.fixture
+def bulk_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(Sale, "BULK_DIR", str(tmp_path))
+    return tmp_path
+
+
+def write_input(path, lines):
+    header = "stock,notes,make,model,year,age,mileage,condition,original_price"
+    rows = [f"{i if i % 11 else ''},{'' if i < 5 else 'note'},{line}" for i, line in enumerate(lines, start=1)]
+    path.write_text("\n".join([header, *rows]) + "\n")
+
+
+def test_parquet_output_keeps_one_schema_across_chunks(bulk_dir):
+    # The first chunk has no rejects and empty notes; the stock number goes missing later
+    lines = [VALID[i % 2] for i in range(5)] + [INVALID[i % 3] for i in range(5)] + VALID
+    write_input(bulk_dir / "cars.csv", lines)
+    result = asyncio.run(Sale.score_vehicle_file("cars.csv", "valued.parquet", chunksize=5))
+    assert "error" not in result, result
+    assert (result["scored"], result["rejected"]) == (7, 5)
+
+    scored = pd.read_parquet(bulk_dir / "valued.parquet")
+    rejected = pd.read_parquet(bulk_dir / "valued.rejects.parquet")
+    assert scored["stock"].isna().sum() == 1
+    assert rejected["row"].tolist() == list(range(5, 10))
+    assert rejected["error"].str.startswith("Input error").all()
+    assert rejected.loc[rejected["condition"] == "Good", "mileage"].tolist() == ["60000", "many", "60000", "many"]
+
+    asyncio.run(Sale.score_vehicle_file("cars.csv", "valued.csv", chunksize=5))
+    expected = pd.read_csv(bulk_dir / "valued.csv")
+    assert scored["estimated_resale_value"].tolist() == expected["estimated_resale_value"].tolist()
@@ -0,0 +1,52 @@
+import joblib
+import numpy as np
+
+import Sale
+from comparables import RECORD_BYTES, ComparableSalesIndex
+
+from test_training import vehicle_frame
+
+
+def sales_frame():
+    df = vehicle_frame(20, rows_per_model=50)
+    # A second spelling of one model belongs to the same partition
+    df.loc[df.index[:10], "model"] = "MODEL 0"
+    return df
+
+
+def test_query_returns_the_nearest_sales_with_their_names():
+    df = sales_frame()
+    index = ComparableSalesIndex.build([df.iloc[:400], df.iloc[400:]])
+    sales = index.query("make", "model 0", 2015, 100000.0, 25000.0, k=60)
+    same = df[df["model"].str.casefold() == "model 0"]
+    assert len(sales) == len(same) == 50
+    assert {sale["model"] for sale in sales} == {"Model 0", "MODEL 0"}
+    assert sorted(sale["estimated_resale_value"] for sale in sales) == sorted(same["estimated_resale_value"])
+    assert [sale["distance"] for sale in sales] == sorted(sale["distance"] for sale in sales)
+    assert index.query("Make", "Model 99", 2015, 100000.0, 25000.0) is None
+
+
+def test_memory_budget_samples_the_records():
+    df = sales_frame()
+    index = ComparableSalesIndex.build([df.iloc[:500], df.iloc[500:]], memory_budget_mb=300 * RECORD_BYTES / 2**20)
+    assert index.report["records"] == 300
+    assert index.report["records_read"] == len(df)
+    assert index.query("Make", "Model 1", 2015, 100000.0, 25000.0, k=1)[0]["model"] == "Model 1"
+
+
+def test_index_is_memory_mapped(tmp_path):
+    index = ComparableSalesIndex.build([sales_frame()])
+    joblib.dump(index, tmp_path / "index.joblib")
+    mapped = joblib.load(tmp_path / "index.joblib", mmap_mode="r")
+    assert all(isinstance(values, np.memmap) for values in mapped.columns.values())
+    _, _, tree = mapped.partitions[("make", "model 3")]
+    assert all(isinstance(np.asarray(a).base, np.memmap) or isinstance(a, np.memmap) for a in tree.get_arrays()[:2])
+    query = ("Make", "Model 3", 2010, 50000.0, 30000.0)
+    assert mapped.query(*query, k=5) == index.query(*query, k=5)
+
+
+def test_unchanged_data_shares_the_served_index(monkeypatch):
+    current = Sale.warm_up()
+    assert Sale.build_comparables_index(Sale.training_sources()) is current.comparables
+    monkeypatch.setattr(Sale, "COMPARABLES_MEMORY_MB", 0)
+    assert Sale.build_comparables_index(Sale.training_sources()) is None
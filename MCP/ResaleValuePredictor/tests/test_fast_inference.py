@@ -0,0 +1,49 @@
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import Sale
+from fast_inference import INPUT_FIELDS, CompiledRegressor, compile_pipeline
+from training import train_model_from_csv
+
+UNSEEN_MAKE = ("Tesla", "Model 3", 2021, 4, 20000.0, "Good", 45000.0)
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return train_model_from_csv(Sale.CSV_DATA, n_estimators=20)
+
+
+@pytest.fixture(scope="module")
+def queries():
+    df = pd.read_csv(StringIO(Sale.CSV_DATA)).drop(columns="estimated_resale_value")
+    rows = list(df[list(INPUT_FIELDS)].sample(200, random_state=0).itertuples(index=False, name=None))
+    return [*rows, UNSEEN_MAKE]
+
+
+@pytest.mark.parametrize("float32, tolerance", [(False, 1e-6), (True, 0.01)])
+def test_compiled_matches_sklearn_pipeline(pipeline, queries, float32, tolerance):
+    compiled = compile_pipeline(pipeline, float32=float32)
+    assert compiled is not None
+    expected = pipeline.predict(pd.DataFrame(queries, columns=list(INPUT_FIELDS)))
+    assert np.max(np.abs(compiled.predict_rows(queries) - expected)) <= tolerance
+    columns = {field: [row[i] for row in queries] for i, field in enumerate(INPUT_FIELDS)}
+    assert np.max(np.abs(compiled.forest.predict(compiled.transform_columns(columns)) - expected)) <= tolerance
+
+
+def test_served_model_releases_trees_but_predicts_the_same(pipeline, queries):
+    served = Sale.build_served_model(pipeline, {}, Sale.CSV_DATA)
+    assert isinstance(served.pipeline.named_steps["regressor"], CompiledRegressor)
+    assert served.backend == "RandomForestRegressor"
+    df = pd.DataFrame(queries, columns=list(INPUT_FIELDS))
+    np.testing.assert_allclose(served.pipeline.predict(df), pipeline.predict(df), atol=1e-6)
+
+
+def test_sklearn_pipeline_reloads_the_served_forest():
+    current = Sale.warm_up()
+    pipeline = Sale.sklearn_pipeline(current)
+    assert hasattr(pipeline.named_steps["regressor"], "estimators_")
+    df = pd.DataFrame([Sale.WARM_UP_ROW, UNSEEN_MAKE], columns=list(INPUT_FIELDS))
+    np.testing.assert_allclose(current.pipeline.predict(df), pipeline.predict(df), atol=1e-6)
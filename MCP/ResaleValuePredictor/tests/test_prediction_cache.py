@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import Sale
+from prediction_cache import PredictionCache
+
+CIVICS = [("Honda", "Civic", 2018, 7, mileage, "Good", 22000.0) for mileage in (80000.0, 81000.0, 84999.0)]
+
+
+def test_default_mode_is_exact():
+    assert Sale.CACHE_MODE == "exact"
+    assert not Sale.prediction_cache.bucketed
+    assert not PredictionCache().bucketed
+
+
+def test_cached_predictions_equal_uncached():
+    Sale.warm_up()
+    hits = Sale.prediction_cache.hits
+
+    async def run():
+        return [[await Sale.predict_one(row), await Sale.predict_one(row)] for row in CIVICS]
+
+    results = asyncio.run(run())
+    uncached = Sale.predict_rows(CIVICS)
+    for (first, cached), expected in zip(results, uncached):
+        assert first == cached == float(expected)
+    assert Sale.prediction_cache.hits == hits + len(CIVICS)
+
+
+@pytest.mark.parametrize("vehicle", [CIVICS[0], ("honda", "civic", *CIVICS[0][2:])])
+def test_tool_matches_batch_tool(vehicle):
+    Sale.warm_up()
+    record = dict(zip(Sale.BATCH_FIELDS, vehicle))
+
+    async def run():
+        single = [await Sale.estimate_resale_value(*vehicle) for _ in range(2)]
+        return single, await Sale.estimate_resale_values_batch([record])
+
+    single, batch = asyncio.run(run())
+    assert single[0] == single[1] == f"Estimated resale value: ${batch[0]['estimated_resale_value']}"
+    assert batch[0]["estimated_resale_value"] == round(float(Sale.predict_rows([vehicle])[0]), 2)
@@ -0,0 +1,61 @@
+import asyncio
+import collections
+import functools
+import os
+import signal
+from concurrent.futures.process import BrokenProcessPool
+from types import SimpleNamespace
+
+import pytest
+
+import model_registry
+import Sale
+
+
+def test_retraining_recovers_from_a_dead_training_process(monkeypatch):
+    Sale.warm_up()
+    broken = Sale.new_retrain_executor()
+    monkeypatch.setattr(Sale, "retrain_executor", broken)
+    os.kill(broken.submit(os.getpid).result(), signal.SIGKILL)
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os.getpid).result()
+
+    try:
+        asyncio.run(Sale.retrain_in_background())
+        assert Sale.retrain_state["last_error"].startswith("Training process died")
+        assert Sale.retrain_executor is not broken
+
+        asyncio.run(Sale.retrain_in_background())
+        assert Sale.retrain_state["last_error"] is None
+    finally:
+        Sale.retrain_executor.shutdown()
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "delete_artifacts",
+                        functools.partial(model_registry.delete_artifacts, model_dir=str(tmp_path)))
+    for name in ["old", "kept", "current", "other"]:
+        for path in model_registry.artifact_paths(name, str(tmp_path)).values():
+            open(path, "w").close()
+    for name in ["earlier", "latest"]:
+        open(model_registry.preprocessed_path(name, str(tmp_path)), "w").close()
+    return tmp_path
+
+
+def test_prune_removes_artifacts_that_left_the_history(model_dir, monkeypatch):
+    models = {version: SimpleNamespace(version=version) for version in ["old", "kept", "current"]}
+    monkeypatch.setattr(Sale, "model_history", collections.deque([models["kept"], models["current"]]))
+    monkeypatch.setattr(Sale, "served", models["current"])
+    monkeypatch.setattr(Sale, "served_artifacts", {"old", "kept", "current"})
+    monkeypatch.setattr(Sale, "preprocessed_artifacts", {"earlier", "latest"})
+
+    Sale.prune_artifacts("latest")
+    assert sorted(os.listdir(model_dir)) == [
+        "preprocessed-latest.joblib",
+        "resale-current.joblib", "resale-current.json",
+        "resale-kept.joblib", "resale-kept.json",
+        "resale-other.joblib", "resale-other.json",
+    ]
+    assert Sale.served_artifacts == {"kept", "current"}
+    assert Sale.preprocessed_artifacts == {"latest"}
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from training import HIST_GB_MAX_CATEGORIES, train_model_from_csv
+
+
+def vehicle_frame(n_models: int, rows_per_model: int = 3, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = n_models * rows_per_model
+    year = rng.integers(2000, 2024, n)
+    original_price = rng.uniform(15000, 40000, n).round()
+    return pd.DataFrame({
+        "make": "Make",
+        "model": [f"Model {i}" for i in range(n_models) for _ in range(rows_per_model)],
+        "year": year,
+        "age": 2025 - year,
+        "original_price": original_price,
+        "mileage": rng.uniform(10000, 300000, n).round(),
+        "condition": rng.choice(["Poor", "Fair", "Good", "Excellent"], n),
+        "estimated_resale_value": (original_price * (year - 1995) / 30).round(),
+    })
+
+
+def test_hist_gb_trains_on_more_than_255_models():
+    df = vehicle_frame(400)
+    assert df["model"].nunique() > HIST_GB_MAX_CATEGORIES
+    pipeline = train_model_from_csv(df, n_estimators=10, backend="hist_gb")
+
+    queries = df.drop(columns="estimated_resale_value").iloc[[0, len(df) - 1]].copy()
+    unknown = queries.iloc[[0]].assign(model="Never Seen")
+    predictions = pipeline.predict(pd.concat([queries, unknown]))
+    assert predictions.shape == (3,)
+    assert np.isfinite(predictions).all()
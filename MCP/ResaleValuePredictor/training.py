@@ -0,0 +1,277 @@
+import copy
+import logging
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+
+from data_source import load_training_frame
+from model_registry import MODEL_DIR, load_or_train, load_preprocessed, save_preprocessed, training_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for fitting trees (-1 = all cores); doesn't change the fitted model
+TRAINING_JOBS = int(os.environ.get("RESALE_TRAINING_JOBS", -1))
+
+CATEGORICAL_FEATURES = ["make", "model", "condition"]
+NUMERIC_FEATURES = ["year", "age", "mileage", "original_price"]
+
+# Regressor backends: "forest" one-hot encodes the categoricals for a RandomForestRegressor,
+# "hist_gb" ordinal-encodes them for HistGradientBoostingRegressor's native categorical splits
+BACKENDS = ("forest", "hist_gb")
+
+# HistGradientBoostingRegressor accepts at most 255 categories per categorical feature; past
+# that, the rarest makes/models share one "infrequent" category
+HIST_GB_MAX_CATEGORIES = 255
+
+# Compact mode: per-tree limits (unless max_depth/max_leaf_nodes are given), the share of
+# rows held out to decide which trees to keep, the separate share held out to report the
+# result on, and how much worse than the full forest's selection RMSE the pruned forest may be
+COMPACT_MAX_DEPTH = 12
+COMPACT_MAX_LEAF_NODES = 512
+COMPACT_VALIDATION_FRACTION = 0.1
+COMPACT_HOLDOUT_FRACTION = 0.1
+COMPACT_RMSE_TOLERANCE = 0.01
+# Floor on the pruned forest, so a small validation slice can't reduce it to a handful of lucky trees
+COMPACT_MIN_TREES = 25
+
+
+def make_preprocessor(backend: str = "forest") -> ColumnTransformer:
+    """ColumnTransformer feeding the given backend; the categorical step is always named "cat"."""
+    if backend == "hist_gb":
+        # Unknown categories become NaN, which the booster treats as missing
+        encoder = OrdinalEncoder(
+            handle_unknown="use_encoded_value", unknown_value=np.nan, max_categories=HIST_GB_MAX_CATEGORIES
+        )
+        return ColumnTransformer([
+            ("cat", encoder, CATEGORICAL_FEATURES),
+            ("num", "passthrough", NUMERIC_FEATURES)
+        ])
+    if backend == "forest":
+        return ColumnTransformer([
+            ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_FEATURES),
+            ("num", StandardScaler(), NUMERIC_FEATURES)
+        ])
+    raise ValueError(f"Unknown model backend {backend!r}; choose one of {', '.join(BACKENDS)}")
+
+
+def make_regressor(backend: str, n_estimators: int, max_depth, max_leaf_nodes, min_samples_leaf: int,
+                   random_state: int, n_jobs: int):
+    if backend == "hist_gb":
+        return HistGradientBoostingRegressor(
+            max_iter=n_estimators,
+            max_depth=max_depth,
+            max_leaf_nodes=31 if max_leaf_nodes is None else max_leaf_nodes,
+            min_samples_leaf=min_samples_leaf,
+            # The ordinal-encoded columns come first in the preprocessor output
+            categorical_features=list(range(len(CATEGORICAL_FEATURES))),
+            random_state=random_state,
+        )
+    return RandomForestRegressor(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        max_leaf_nodes=max_leaf_nodes,
+        min_samples_leaf=min_samples_leaf,
+        random_state=random_state,
+        n_jobs=n_jobs,
+    )
+
+
+def preprocessed_fingerprint(csv_data, memory_budget_mb: float = 512.0, sampling: str = "subsample",
+                             random_state: int = 42, backend: str = "forest") -> Optional[str]:
+    """Fingerprint under which preprocess_training_data caches its output for this data."""
+    return training_fingerprint(csv_data, {
+        "stage": "preprocessor",
+        "memory_budget_mb": memory_budget_mb,
+        "sampling": sampling,
+        "random_state": random_state,
+        "backend": backend,
+    })
+
+
+def preprocess_training_data(csv_data, memory_budget_mb: float = 512.0, sampling: str = "subsample",
+                             random_state: int = 42, backend: str = "forest"):
+    """Load the training data and fit the ColumnTransformer, reusing the cached output for the same data."""
+    preprocessor = make_preprocessor(backend)
+    fingerprint = preprocessed_fingerprint(csv_data, memory_budget_mb, sampling, random_state, backend)
+    cached = load_preprocessed(fingerprint) if fingerprint else None
+    if cached is not None:
+        logger.info(f"Reusing preprocessed training data {fingerprint}")
+        return cached
+
+    df = load_training_frame(csv_data, memory_budget_mb=memory_budget_mb, strategy=sampling, seed=random_state)
+
+    weights = df.pop("weight").to_numpy() if "weight" in df else None
+    X = df.drop("estimated_resale_value", axis=1)
+    y = df["estimated_resale_value"].to_numpy()
+
+    payload = {"preprocessor": preprocessor, "X": preprocessor.fit_transform(X), "y": y, "weights": weights}
+    if fingerprint:
+        save_preprocessed(fingerprint, payload)
+    return payload
+
+
+def forest_nbytes(regressor) -> int:
+    """Resident size of a fitted forest's node and leaf-value arrays."""
+    total = 0
+    for estimator in regressor.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state["nodes"].nbytes + state["values"].nbytes
+    return total
+
+
+def regressor_nbytes(regressor) -> int:
+    """forest_nbytes for forests, the compiled size for shared compiled models, else the pickled size."""
+    if hasattr(regressor, "estimators_"):
+        return forest_nbytes(regressor)
+    if hasattr(regressor, "forest"):
+        return regressor.forest.nbytes
+    return len(pickle.dumps(regressor, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _rmse(predictions, y) -> float:
+    return float(np.sqrt(np.mean((predictions - y) ** 2)))
+
+
+def prune_forest(regressor, X_val, y_val, X_holdout=None, y_holdout=None, tolerance: float = COMPACT_RMSE_TOLERANCE,
+                 min_trees: int = COMPACT_MIN_TREES) -> Dict[str, Any]:
+    """Keep the smallest set of at least min_trees trees whose average is within tolerance of the full forest on X_val.
+
+    Trees are picked greedily, each time adding the one that lowers the RMSE of the
+    running average on X_val the most. The selection RMSE is biased in favour of the
+    pruned forest, so when X_holdout is given the report also carries RMSE before and
+    after pruning on that untouched slice. Modifies regressor in place and returns the report.
+    """
+    per_tree = np.stack([estimator.predict(X_val) for estimator in regressor.estimators_], axis=1)
+    full_rmse = _rmse(per_tree.mean(axis=1), y_val)
+    bytes_before, trees_before = forest_nbytes(regressor), len(regressor.estimators_)
+    holdout_before = _rmse(regressor.predict(X_holdout), y_holdout) if X_holdout is not None else None
+
+    chosen, remaining = [], list(range(trees_before))
+    total = np.zeros(len(y_val))
+    rmse = float("inf")
+    while remaining and (len(chosen) < min_trees or rmse > full_rmse * (1 + tolerance)):
+        candidates = (total[:, None] + per_tree[:, remaining]) / (len(chosen) + 1)
+        errors = np.sqrt(np.mean((candidates - y_val[:, None]) ** 2, axis=0))
+        best = int(np.argmin(errors))
+        rmse = float(errors[best])
+        total += per_tree[:, remaining[best]]
+        chosen.append(remaining.pop(best))
+
+    regressor.estimators_ = [regressor.estimators_[i] for i in sorted(chosen)]
+    regressor.n_estimators = len(regressor.estimators_)
+    report = {
+        "trees_before": trees_before,
+        "trees_after": regressor.n_estimators,
+        "forest_bytes_before": bytes_before,
+        "forest_bytes_after": forest_nbytes(regressor),
+        "selection_rmse_before": round(full_rmse, 2),
+        "selection_rmse_after": round(rmse, 2),
+    }
+    if X_holdout is not None:
+        report["holdout_rmse_before"] = round(holdout_before, 2)
+        report["holdout_rmse_after"] = round(_rmse(regressor.predict(X_holdout), y_holdout), 2)
+    return report
+
+
+def train_model_from_csv(
+    csv_data,
+    n_estimators: int = 100,
+    random_state: int = 42,
+    memory_budget_mb: float = 512.0,
+    sampling: str = "subsample",
+    n_jobs: int = None,
+    max_depth: int = None,
+    min_samples_leaf: int = 1,
+    compact: bool = False,
+    max_leaf_nodes: int = None,
+    backend: str = "forest",
+):
+    """Train the pipeline from inline CSV text, a CSV/Parquet path, a list of those or an iterator of DataFrame chunks.
+
+    Data is streamed in chunks and kept within memory_budget_mb by subsampling or
+    aggregating (see data_source.load_training_frame). Trees are fit on n_jobs cores
+    (TRAINING_JOBS by default).
+
+    With compact=True trees are limited to COMPACT_MAX_DEPTH levels and
+    COMPACT_MAX_LEAF_NODES leaves, fit on all but a selection slice and a holdout slice,
+    and then pruned with prune_forest on the selection slice. The report, with RMSE on the
+    holdout slice, is kept as regressor.compaction_report_, and the server compiles such
+    models with float32 nodes.
+
+    backend picks the regressor (see BACKENDS). For "hist_gb", n_estimators is the number
+    of boosting iterations and n_jobs is ignored (it uses OpenMP threads); compact mode
+    and add_trees are forest-only.
+    """
+    if compact and backend != "forest":
+        raise ValueError("Compact mode is only available for the forest backend")
+    data = preprocess_training_data(csv_data, memory_budget_mb, sampling, random_state, backend)
+    if compact:
+        max_depth = COMPACT_MAX_DEPTH if max_depth is None else max_depth
+        max_leaf_nodes = COMPACT_MAX_LEAF_NODES if max_leaf_nodes is None else max_leaf_nodes
+    regressor = make_regressor(
+        backend, n_estimators, max_depth, max_leaf_nodes, min_samples_leaf, random_state,
+        TRAINING_JOBS if n_jobs is None else n_jobs,
+    )
+    if not compact:
+        regressor.fit(data["X"], data["y"], sample_weight=data["weights"])
+    else:
+        weights = data["weights"] if data["weights"] is not None else np.ones(len(data["y"]))
+        held_out = COMPACT_VALIDATION_FRACTION + COMPACT_HOLDOUT_FRACTION
+        X_fit, X_rest, y_fit, y_rest, w_fit, _ = train_test_split(
+            data["X"], data["y"], weights, test_size=held_out, random_state=random_state
+        )
+        X_val, X_holdout, y_val, y_holdout = train_test_split(
+            X_rest, y_rest, test_size=COMPACT_HOLDOUT_FRACTION / held_out, random_state=random_state
+        )
+        regressor.fit(X_fit, y_fit, sample_weight=w_fit if data["weights"] is not None else None)
+        regressor.compaction_report_ = prune_forest(regressor, X_val, y_val, X_holdout, y_holdout)
+        logger.info(f"Compact forest: {regressor.compaction_report_}")
+    return Pipeline([
+        ("preprocessor", data["preprocessor"]),
+        ("regressor", regressor)
+    ])
+
+
+def add_trees(pipeline, new_data, n_new_trees: int = 20, memory_budget_mb: float = 512.0, n_jobs: int = None):
+    """Return a copy of the pipeline with n_new_trees extra trees fit on new_data (warm start).
+
+    The existing trees and the fitted preprocessor are kept as they are, so categories
+    that first appear in new_data are encoded as unknown.
+    """
+    if not hasattr(pipeline.named_steps["regressor"], "estimators_"):
+        raise ValueError("add_trees needs a forest backend")
+    df = load_training_frame(new_data, memory_budget_mb=memory_budget_mb)
+    weights = df.pop("weight").to_numpy() if "weight" in df else None
+    X = df.drop("estimated_resale_value", axis=1)
+    y = df["estimated_resale_value"].to_numpy()
+
+    pipeline = copy.deepcopy(pipeline)
+    regressor = pipeline.named_steps["regressor"]
+    regressor.set_params(
+        warm_start=True,
+        n_estimators=len(regressor.estimators_) + n_new_trees,
+        n_jobs=TRAINING_JOBS if n_jobs is None else n_jobs,
+    )
+    regressor.fit(pipeline.named_steps["preprocessor"].transform(X), y, sample_weight=weights)
+    return pipeline
+
+
+def retrain_to_artifact(sources, params: Dict[str, Any], model_dir: str = MODEL_DIR) -> Dict[str, Any]:
+    """Train on sources and save the artifact; returns its metadata.
+
+    Runs in a background process, so only the metadata (with the fingerprint to load
+    the artifact by, and that of the preprocessed data it cached) travels back to the server.
+    """
+    logging.basicConfig(level=logging.INFO)
+    _, meta = load_or_train(sources, train_model_from_csv, params, model_dir)
+    if not meta.get("fingerprint"):
+        raise ValueError("Background retraining needs fingerprintable training sources (text or file paths)")
+    keys = ("memory_budget_mb", "sampling", "random_state", "backend")
+    return {**meta, "preprocessed_fingerprint": preprocessed_fingerprint(sources, **{k: params[k] for k in keys if k in params})}
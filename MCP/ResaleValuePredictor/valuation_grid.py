@@ -0,0 +1,135 @@
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CONDITIONS = ("Poor", "Fair", "Good", "Excellent")
+
+
+class ValuationGrid:
+    """Precomputed predictions over make/model x year x age x condition x mileage x price.
+
+    Lookups index the float32 array directly and interpolate bilinearly between the
+    neighbouring mileage and original-price grid points. Anything outside the grid
+    (unknown make/model, year or age not on the grid, mileage or price beyond the
+    covered range) returns None so the caller can fall back to the real model.
+
+    Age is tied to year: only ages of reference_year - year + offset for offset in
+    age_offsets are precomputed, which covers the age conventions used by the
+    training data and the prompt parser.
+    """
+
+    def __init__(self, pairs, years, age_offsets, reference_year, mileage_points, price_points, values):
+        self.pairs = list(pairs)
+        self.pair_index = {(make.casefold(), model.casefold()): i for i, (make, model) in enumerate(self.pairs)}
+        self.years = np.asarray(years, dtype=np.int64)
+        self.age_offsets = list(age_offsets)
+        self.reference_year = reference_year
+        self.mileage_points = np.asarray(mileage_points, dtype=np.float64)
+        self.price_points = np.asarray(price_points, dtype=np.float64)
+        self.values = values
+        self.report: Dict[str, Any] = {}
+
+    @classmethod
+    def build(
+        cls,
+        pipeline,
+        pairs: Iterable[Tuple[str, str]],
+        years: Sequence[int] = range(2000, 2025),
+        age_offsets: Sequence[int] = (-1, 0),
+        reference_year: int = 2025,
+        mileage_points: Sequence[float] = np.arange(0, 300001, 20000),
+        price_points: Sequence[float] = np.arange(10000, 80001, 10000),
+        chunk_size: int = 200000,
+    ) -> "ValuationGrid":
+        start = time.perf_counter()
+        pairs = list(pairs)
+        shape = (len(pairs), len(years), len(age_offsets), len(CONDITIONS), len(mileage_points), len(price_points))
+
+        # Every grid cell as one row, in C order of `shape`
+        idx = np.indices(shape).reshape(len(shape), -1)
+        pair_arr = np.array(pairs, dtype=object)
+        year_arr = np.asarray(years)[idx[1]]
+        frame = pd.DataFrame({
+            "make": pair_arr[idx[0], 0],
+            "model": pair_arr[idx[0], 1],
+            "year": year_arr,
+            "age": reference_year - year_arr + np.asarray(age_offsets)[idx[2]],
+            "mileage": np.asarray(mileage_points, dtype=np.float64)[idx[4]],
+            "condition": np.array(CONDITIONS, dtype=object)[idx[3]],
+            "original_price": np.asarray(price_points, dtype=np.float64)[idx[5]],
+        })
+        flat = np.empty(len(frame), dtype=np.float32)
+        for lo in range(0, len(frame), chunk_size):
+            flat[lo:lo + chunk_size] = pipeline.predict(frame.iloc[lo:lo + chunk_size])
+
+        grid = cls(pairs, years, age_offsets, reference_year, mileage_points, price_points, flat.reshape(shape))
+        grid.report = {
+            "cells": int(flat.size),
+            "memory_bytes": int(grid.values.nbytes),
+            "build_seconds": round(time.perf_counter() - start, 3),
+        }
+        return grid
+
+    def lookup(self, make, model_name, year, age, mileage, condition, original_price) -> Optional[float]:
+        pair = self.pair_index.get((str(make).casefold(), str(model_name).casefold()))
+        if pair is None or condition not in CONDITIONS:
+            return None
+        year_i = int(year) - int(self.years[0])
+        if year_i < 0 or year_i >= len(self.years) or self.years[year_i] != year:
+            return None
+        offset = int(age) - (self.reference_year - int(year))
+        if offset not in self.age_offsets or age != int(age):
+            return None
+        m = _bracket(self.mileage_points, mileage)
+        p = _bracket(self.price_points, original_price)
+        if m is None or p is None:
+            return None
+
+        (m0, m1, mw), (p0, p1, pw) = m, p
+        cell = self.values[pair, year_i, self.age_offsets.index(offset), CONDITIONS.index(condition)]
+        low = cell[m0, p0] * (1 - pw) + cell[m0, p1] * pw
+        high = cell[m1, p0] * (1 - pw) + cell[m1, p1] * pw
+        return float(low * (1 - mw) + high * mw)
+
+    def measure_error(self, pipeline, n_samples: int = 2000, seed: int = 0) -> Dict[str, float]:
+        """Compare lookups with pipeline.predict on random in-grid rows (off the grid points)."""
+        rng = np.random.default_rng(seed)
+        pair_i = rng.integers(len(self.pairs), size=n_samples)
+        year = self.years[rng.integers(len(self.years), size=n_samples)]
+        age = self.reference_year - year + np.asarray(self.age_offsets)[rng.integers(len(self.age_offsets), size=n_samples)]
+        condition = np.array(CONDITIONS, dtype=object)[rng.integers(len(CONDITIONS), size=n_samples)]
+        mileage = rng.uniform(self.mileage_points[0], self.mileage_points[-1], size=n_samples)
+        price = rng.uniform(self.price_points[0], self.price_points[-1], size=n_samples)
+        frame = pd.DataFrame({
+            "make": [self.pairs[i][0] for i in pair_i],
+            "model": [self.pairs[i][1] for i in pair_i],
+            "year": year,
+            "age": age,
+            "mileage": mileage,
+            "condition": condition,
+            "original_price": price,
+        })
+        expected = pipeline.predict(frame)
+        actual = np.array([self.lookup(*row) for row in frame.itertuples(index=False, name=None)])
+        error = np.abs(actual - expected)
+        return {
+            "max_abs_error": round(float(error.max()), 2),
+            "mean_abs_error": round(float(error.mean()), 2),
+            "max_rel_error": round(float((error / np.maximum(np.abs(expected), 1.0)).max()), 4),
+        }
+
+
+def _bracket(points: np.ndarray, x) -> Optional[Tuple[int, int, float]]:
+    """Neighbouring grid indices and interpolation weight for x, or None outside the grid."""
+    if x < points[0] or x > points[-1]:
+        return None
+    hi = int(np.searchsorted(points, x, side="left"))
+    if hi == 0:
+        return 0, 0, 0.0
+    lo = hi - 1
+    return lo, hi, float((x - points[lo]) / (points[hi] - points[lo]))
@@ -0,0 +1,81 @@
+"""Cache of /points lookups: rounded coordinates -> forecast URL, in memory and in SQLite."""
+import logging
+import sqlite3
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PointsCache:
+    """Forecast URLs by coordinates rounded to `precision` decimal places.
+
+    NWS forecast grid cells are 2.5 km across, and 2 decimal places of a degree (at most
+    ~1.1 km) keep nearby requests on the same key. Entries live in a dict and, when a
+    path is given, in a SQLite file that is read back on startup, so the cache survives
+    restarts. Entries older than ttl_seconds are ignored and refetched.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 30 * 86400, precision: int = 2):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self.entries = {}  # key -> (forecast URL, fetched at)
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS points (key TEXT PRIMARY KEY, forecast_url TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            cutoff = time.time() - ttl_seconds
+            self.db.execute("DELETE FROM points WHERE fetched_at < ?", (cutoff,))
+            self.db.commit()
+            for key, url, fetched_at in self.db.execute("SELECT key, forecast_url, fetched_at FROM points"):
+                self.entries[key] = (url, fetched_at)
+            logger.info(f"Loaded {len(self.entries)} cached points from {path}")
+
+    def coordinates(self, latitude: float, longitude: float) -> str:
+        """'lat,lon' rounded to the cache precision, as used in both the key and the /points URL."""
+        return ",".join(
+            f"{round(value, self.precision) + 0.0:.{self.precision}f}".rstrip("0").rstrip(".")
+            for value in (latitude, longitude)
+        )
+
+    def get(self, latitude: float, longitude: float) -> Optional[str]:
+        entry = self.entries.get(self.coordinates(latitude, longitude))
+        if entry is None or time.time() - entry[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, latitude: float, longitude: float, forecast_url: str):
+        key, now = self.coordinates(latitude, longitude), time.time()
+        self.entries[key] = (forecast_url, now)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO points VALUES (?, ?, ?)", (key, forecast_url, now))
+            self.db.commit()
+
+    def discard(self, latitude: float, longitude: float):
+        key = self.coordinates(latitude, longitude)
+        self.entries.pop(key, None)
+        if self.db is not None:
+            self.db.execute("DELETE FROM points WHERE key = ?", (key,))
+            self.db.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "path": self.path,
+        }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
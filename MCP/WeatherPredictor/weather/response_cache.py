@@ -0,0 +1,136 @@
+"""HTTP response cache for NWS JSON documents that follows the server's caching headers."""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import httpx
+
+
+@dataclass
+class CacheEntry:
+    body: Any              # the parsed JSON, shared by every caller that gets it
+    size: int              # bytes of the response body
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float      # time.monotonic() after which the entry must be revalidated
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> dict:
+        """Conditional request headers that let the server answer 304 Not Modified."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def cache_directives(response: httpx.Response) -> dict:
+    directives = {}
+    for part in response.headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def freshness_lifetime(response: httpx.Response) -> float:
+    """Seconds the response may be served without revalidation (RFC 9111 section 4.2.1), less its Age."""
+    directives = cache_directives(response)
+    if "no-cache" in directives:
+        return 0.0
+    lifetime = 0.0
+    try:
+        if "max-age" in directives:
+            lifetime = float(directives["max-age"])
+        elif "Expires" in response.headers:
+            date = response.headers.get("Date")
+            now = parsedate_to_datetime(date).timestamp() if date else time.time()
+            lifetime = parsedate_to_datetime(response.headers["Expires"]).timestamp() - now
+        lifetime -= float(response.headers.get("Age", 0))
+    except (TypeError, ValueError):
+        # An unparseable date or number means already expired
+        return 0.0
+    return max(lifetime, 0.0)
+
+
+class ResponseCache:
+    """LRU cache of parsed NWS responses, bounded by entry count and total body bytes.
+
+    Fresh entries are served without a request. Stale entries that have an ETag or
+    Last-Modified are revalidated with a conditional request, and a 304 reuses the
+    parsed body that is already cached. Responses marked no-store, and responses with
+    neither a freshness lifetime nor a validator, are not stored. Callers must treat
+    the returned bodies as read-only.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> Any:
+        """GET url through the cache and return its parsed JSON; request errors propagate as from httpx."""
+        entry = self.entries.get(url)
+        if entry is not None:
+            self.entries.move_to_end(url)
+            if entry.is_fresh():
+                self.hits += 1
+                return entry.body
+        response = await client.get(url, headers=entry.validators() if entry is not None else None)
+        if response.status_code == 304 and entry is not None:
+            self.revalidations += 1
+            entry.expires_at = time.monotonic() + freshness_lifetime(response)
+            entry.etag = response.headers.get("ETag", entry.etag)
+            entry.last_modified = response.headers.get("Last-Modified", entry.last_modified)
+            return entry.body
+        self.misses += 1
+        response.raise_for_status()
+        body = response.json()
+        self.store(url, response, body)
+        return body
+
+    def store(self, url: str, response: httpx.Response, body: Any):
+        self._remove(url)
+        if "no-store" in cache_directives(response):
+            return
+        lifetime = freshness_lifetime(response)
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        size = len(response.content)
+        if (lifetime <= 0 and not etag and not last_modified) or size > self.max_bytes or self.max_entries <= 0:
+            return
+        self.entries[url] = CacheEntry(body, size, etag, last_modified, time.monotonic() + lifetime)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def _remove(self, url: str):
+        entry = self.entries.pop(url, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def stats(self) -> dict:
+        requests = self.hits + self.revalidations + self.misses
+        rate = lambda n: round(n / requests, 4) if requests else 0.0  # noqa: E731
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": rate(self.hits),
+            "revalidation_rate": rate(self.revalidations),
+            "miss_rate": rate(self.misses),
+        }
@@ -1,27 +1,163 @@
-from typing import Any
+from typing import Any, AsyncIterator
+import argparse
+import asyncio
+import functools
+import importlib.util
+import logging
+import os
+from contextlib import asynccontextmanager
 import httpx
 from mcp.server.fastmcp import FastMCP
+from points_cache import PointsCache
+from response_cache import ResponseCache
 
-# Initialize FastMCP server
-mcp = FastMCP("weather")
+logger = logging.getLogger(__name__)
 
 # Constants
-NWS_API_BASE = "https://api.weather.gov"
+# Overridable so benchmarks can point the server at a local stand-in
+NWS_API_BASE = os.environ.get("NWS_API_BASE", "https://api.weather.gov")
 USER_AGENT = "weather-app/1.0"
 
+# Connection pool and timeouts of the shared NWS client
+NWS_MAX_CONNECTIONS = int(os.environ.get("NWS_MAX_CONNECTIONS", 20))
+NWS_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("NWS_MAX_KEEPALIVE_CONNECTIONS", 10))
+NWS_KEEPALIVE_EXPIRY = float(os.environ.get("NWS_KEEPALIVE_EXPIRY", 30.0))
+NWS_CONNECT_TIMEOUT = float(os.environ.get("NWS_CONNECT_TIMEOUT", 5.0))
+NWS_READ_TIMEOUT = float(os.environ.get("NWS_READ_TIMEOUT", 30.0))
+NWS_POOL_TIMEOUT = float(os.environ.get("NWS_POOL_TIMEOUT", 10.0))
+# HTTP/2 multiplexes concurrent requests over one connection and needs the h2 package
+# (pip install httpx[http2]): "auto" uses it when h2 is installed, "1" asks for it, "0" turns it off
+NWS_HTTP2 = os.environ.get("NWS_HTTP2", "auto")
+
+# /points results (the forecast URL for a location) barely ever change, so they are cached
+# on disk; NWS_POINTS_CACHE="" keeps the cache in memory only
+NWS_POINTS_CACHE = os.environ.get(
+    "NWS_POINTS_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "points_cache.sqlite3")
+)
+points_cache = PointsCache(
+    NWS_POINTS_CACHE or None,
+    ttl_seconds=float(os.environ.get("NWS_POINTS_TTL_SECONDS", 30 * 86400)),
+    precision=int(os.environ.get("NWS_POINTS_PRECISION", 2)),
+)
+
+# Parsed NWS responses, reused while fresh and revalidated with ETag/Last-Modified when stale
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("NWS_CACHE_MAX_ENTRIES", 512)),
+    max_bytes=int(os.environ.get("NWS_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+)
+
+# One client per event loop, reused by every request so connections (and TLS sessions) are kept alive
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+def create_client() -> httpx.AsyncClient:
+    http2 = NWS_HTTP2 != "0" and importlib.util.find_spec("h2") is not None
+    if NWS_HTTP2 == "1" and not http2:
+        logger.warning("NWS_HTTP2 is on but the h2 package is not installed; using HTTP/1.1 keep-alive")
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT, "Accept": "application/geo+json"},
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=NWS_MAX_CONNECTIONS,
+            max_keepalive_connections=NWS_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=NWS_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=NWS_CONNECT_TIMEOUT, read=NWS_READ_TIMEOUT, write=NWS_READ_TIMEOUT, pool=NWS_POOL_TIMEOUT
+        ),
+    )
+
+def get_client() -> httpx.AsyncClient:
+    """The shared NWS client of the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        # Pooled connections belong to the loop that opened them, so each loop has its own
+        # client; a client whose loop was closed without close_client can no longer be
+        # closed from here, and is dropped so its sockets are released with it
+        for other in [other for other in _clients if other.is_closed()]:
+            logger.warning("Dropping an NWS client whose event loop closed without close_client()")
+            del _clients[other]
+        client = _clients[loop] = create_client()
+    return client
+
+async def close_client():
+    """Close the running event loop's shared client and its pooled connections."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        await close_client()
+        points_cache.close()
+
+# Initialize FastMCP server; the shared client is closed when the server shuts down
+mcp = FastMCP("weather", lifespan=lifespan)
+
+# Requests in flight by URL: concurrent calls for the same URL share one upstream request
+_in_flight: dict[str, asyncio.Task] = {}
+request_counts = {"requests": 0, "coalesced": 0}
+
+async def fetch_nws(url: str) -> dict[str, Any] | None:
+    try:
+        return await response_cache.fetch(get_client(), url)
+    except Exception:
+        return None
+
+def _request_done(url: str, task: asyncio.Task):
+    if _in_flight.get(url) is task:
+        del _in_flight[url]
+
 async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/geo+json"
-    }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception:
-            return None
+    """Make a request to the NWS API, through the response cache, with proper error handling.
+
+    A call for a URL that is already being fetched waits for that request instead of
+    sending its own, and gets the same parsed result, which callers must not modify.
+    """
+    loop = asyncio.get_running_loop()
+    task = _in_flight.get(url)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(fetch_nws(url))
+        task.add_done_callback(functools.partial(_request_done, url))
+        _in_flight[url] = task
+        request_counts["requests"] += 1
+    else:
+        request_counts["coalesced"] += 1
+    # Shielded so that a caller being cancelled does not cancel the request for the others
+    return await asyncio.shield(task)
+
+async def resolve_forecast_url(latitude: float, longitude: float) -> str | None:
+    """Look up the forecast URL for a location with /points and cache it."""
+    points_data = await make_nws_request(f"{NWS_API_BASE}/points/{points_cache.coordinates(latitude, longitude)}")
+    try:
+        forecast_url = points_data["properties"]["forecast"]
+    except (TypeError, KeyError):
+        return None
+    points_cache.put(latitude, longitude, forecast_url)
+    return forecast_url
+
+async def prewarm_points(path: str, concurrency: int = 8) -> dict:
+    """Resolve the 'latitude,longitude' lines of a file into the points cache."""
+    with open(path) as f:
+        locations = [tuple(float(v) for v in line.split(",")[:2]) for line in f if line.strip() and not line.startswith("#")]
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = []
+
+    async def resolve(latitude, longitude):
+        if points_cache.get(latitude, longitude) is not None:
+            return
+        async with semaphore:
+            if not await resolve_forecast_url(latitude, longitude):
+                failed.append(f"{latitude},{longitude}")
+
+    try:
+        await asyncio.gather(*(resolve(latitude, longitude) for latitude, longitude in locations))
+    finally:
+        await close_client()
+    return {"locations": len(locations), "failed": failed, **points_cache.stats()}
 
 def format_alert(feature: dict) -> str:
     """Format an alert feature into a readable string."""
@@ -60,16 +196,20 @@ async def get_forecast(latitude: float, longitude: float) -> str:
         latitude: Latitude of the location
         longitude: Longitude of the location
     """
-    # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    # First get the forecast grid endpoint, from the cache when possible
+    forecast_url = points_cache.get(latitude, longitude)
+    cached = forecast_url is not None
+    if not cached:
+        forecast_url = await resolve_forecast_url(latitude, longitude)
+        if not forecast_url:
+            return "Unable to fetch forecast data for this location."
 
-    if not points_data:
-        return "Unable to fetch forecast data for this location."
-
-    # Get the forecast URL from the points response
-    forecast_url = points_data["properties"]["forecast"]
     forecast_data = await make_nws_request(forecast_url)
+    if not forecast_data and cached:
+        # The cached URL may have gone stale (grids are occasionally redrawn): resolve it again
+        points_cache.discard(latitude, longitude)
+        forecast_url = await resolve_forecast_url(latitude, longitude)
+        forecast_data = await make_nws_request(forecast_url) if forecast_url else None
 
     if not forecast_data:
         return "Unable to fetch detailed forecast."
@@ -88,6 +228,27 @@ Forecast: {period['detailedForecast']}
 
     return "\n---\n".join(forecasts)
 
+@mcp.tool()
+async def get_cache_stats() -> dict[str, Any]:
+    """Hit, revalidation and miss rates of the NWS response cache, the forecast-location cache's
+    counters, and how many requests were coalesced into one already in flight."""
+    calls = request_counts["requests"] + request_counts["coalesced"]
+    coalescing = {
+        **request_counts,
+        "in_flight": len(_in_flight),
+        "coalesced_rate": round(request_counts["coalesced"] / calls, 4) if calls else 0.0,
+    }
+    return {"responses": response_cache.stats(), "points": points_cache.stats(), "coalescing": coalescing}
+
 if __name__ == "__main__":
-    # Initialize and run the server
-    mcp.run(transport='stdio')
+    parser = argparse.ArgumentParser(description="NWS weather MCP server")
+    parser.add_argument("--prewarm", metavar="FILE",
+                        help="resolve the 'latitude,longitude' lines in FILE into the points cache and exit")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel /points requests when prewarming")
+    args = parser.parse_args()
+    if args.prewarm:
+        logging.basicConfig(level=logging.INFO)
+        print(asyncio.run(prewarm_points(args.prewarm, args.concurrency)))
+    else:
+        # Initialize and run the server
+        mcp.run(transport='stdio')
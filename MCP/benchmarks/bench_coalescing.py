@@ -0,0 +1,73 @@
+"""Bursts of concurrent identical NWS requests, with and without single-flight coalescing.
+
+Each burst sends `concurrency` simultaneous get_alerts calls for the same state to the
+local fake NWS, with the response cache disabled so every burst reaches upstream. Without
+coalescing each call makes its own request; with it the burst shares one. A last check
+cancels one caller mid-request and confirms the others still get the result.
+
+Usage: python benchmarks/bench_coalescing.py [bursts] [concurrency] [nws_latency_ms]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "WeatherPredictor", "weather"))
+
+from fake_nws import FakeNWS  # noqa: E402
+import weather  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+async def burst(concurrency: int):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(weather.get_alerts("TX") for _ in range(concurrency)))
+    assert all("Severe Thunderstorm" in result for result in results)
+    return time.perf_counter() - start
+
+
+async def phase(name, nws, bursts, concurrency):
+    await burst(1)  # open the pooled connection
+    nws.reset_counts()
+    samples = [await burst(concurrency) for _ in range(bursts)]
+    print(f"{name:<18} median burst {statistics.median(samples) * 1000:7.1f} ms, "
+          f"{nws.requests / bursts:5.1f} upstream requests per burst of {concurrency}")
+
+
+async def cancelled_caller(nws):
+    nws.reset_counts()
+    url = f"{nws.base_url}/alerts/active/area/TX"
+    callers = [asyncio.create_task(weather.make_nws_request(url)) for _ in range(5)]
+    await asyncio.sleep(0.005)
+    callers[0].cancel()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    survivors = sum(isinstance(result, dict) for result in results[1:])
+    print(f"cancellation       first caller cancelled: {isinstance(results[0], asyncio.CancelledError)}, "
+          f"{survivors}/4 others got the alerts, {nws.requests} upstream request")
+
+
+async def main(bursts: int, concurrency: int, latency_ms: float):
+    with FakeNWS(latency_ms=latency_ms, alerts=50) as nws:
+        weather.NWS_API_BASE = nws.base_url
+        weather.response_cache = ResponseCache(max_entries=0)
+        make_nws_request = weather.make_nws_request
+
+        weather.make_nws_request = weather.fetch_nws  # every call goes upstream on its own
+        await phase("without coalescing", nws, bursts, concurrency)
+        weather.make_nws_request = make_nws_request
+        await phase("with coalescing", nws, bursts, concurrency)
+        await cancelled_caller(nws)
+
+        print(f"stats              {(await weather.get_cache_stats())['coalescing']}")
+        await weather.close_client()
+
+
+if __name__ == "__main__":
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+                     float(sys.argv[3]) if len(sys.argv) > 3 else 50.0))
@@ -0,0 +1,102 @@
+"""Per-call latency of the shared, pooled NWS client against a new AsyncClient per request.
+
+Both run against the local fake NWS (plain HTTP). They are measured for single requests
+and for get_forecast, which makes two requests in a row. The fake's counters show how
+many TCP connections each variant opened. Most of the per-call cost of a new client is
+building it: httpx loads the CA bundle into a fresh SSL context for every client, even
+for plain HTTP. Against api.weather.gov every new connection also costs a TLS handshake,
+which this local benchmark does not include.
+
+Usage: python benchmarks/bench_nws_client.py [calls] [nws_latency_ms]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "WeatherPredictor", "weather"))
+
+from fake_nws import FakeNWS  # noqa: E402
+import weather  # noqa: E402
+from points_cache import PointsCache  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+async def legacy_request(url: str):
+    """make_nws_request as it was: a new client, and so a new connection, for every call."""
+    headers = {"User-Agent": weather.USER_AGENT, "Accept": "application/geo+json"}
+    async with httpx.AsyncClient() as client:
+        try:
+            response = await client.get(url, headers=headers, timeout=30.0)
+            response.raise_for_status()
+            return response.json()
+        except Exception:
+            return None
+
+
+async def legacy_forecast(latitude: float, longitude: float):
+    points = await legacy_request(f"{weather.NWS_API_BASE}/points/{latitude},{longitude}")
+    return await legacy_request(points["properties"]["forecast"])
+
+
+async def median_ms(fn, calls: int):
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        result = await fn(i)
+        samples.append(time.perf_counter() - start)
+        assert result
+    return statistics.median(samples) * 1000
+
+
+def count_connections(nws: FakeNWS):
+    """Wrap the fake server's handler setup to count accepted connections."""
+    counts = {"connections": 0}
+    handle = nws.server.process_request
+
+    def process_request(request, client_address):
+        counts["connections"] += 1
+        handle(request, client_address)
+
+    nws.server.process_request = process_request
+    return counts
+
+
+async def main(calls: int, latency_ms: float):
+    with FakeNWS(latency_ms=latency_ms) as nws:
+        weather.NWS_API_BASE = nws.base_url
+        # Never hit the points or response caches, so every call makes the same requests as the legacy version
+        weather.points_cache = PointsCache(ttl_seconds=-1)
+        weather.response_cache = ResponseCache(max_entries=0)
+        connections = count_connections(nws)
+        alerts_url = f"{nws.base_url}/alerts/active/area/TX"
+        variants = [
+            ("request", "new client per call", lambda i: legacy_request(alerts_url)),
+            ("request", "shared pooled client", lambda i: weather.make_nws_request(alerts_url)),
+            ("get_forecast", "new client per call", lambda i: legacy_forecast(30.0 + i % 50 * 0.1, -97.0)),
+            ("get_forecast", "shared pooled client", lambda i: weather.get_forecast(30.0 + i % 50 * 0.1, -97.0)),
+        ]
+        print(f"{calls} sequential calls each, fake NWS latency {latency_ms} ms")
+        results = {}
+        for kind, name, fn in variants:
+            await fn(0)  # warm up (the shared client opens its connection here)
+            before = connections["connections"]
+            results[kind, name] = await median_ms(fn, calls)
+            print(f"{kind:<13} {name:<22} median {results[kind, name]:7.2f} ms, "
+                  f"{connections['connections'] - before} connections opened")
+        for kind in ("request", "get_forecast"):
+            saved = results[kind, "new client per call"] - results[kind, "shared pooled client"]
+            print(f"{kind:<13} saved {saved:.2f} ms per call")
+        await weather.close_client()
+
+
+if __name__ == "__main__":
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+                     float(sys.argv[2]) if len(sys.argv) > 2 else 0.0))
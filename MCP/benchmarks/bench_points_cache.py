@@ -0,0 +1,75 @@
+"""get_forecast with the /points cache: cold, warm, after a restart and after a prewarm.
+
+Runs against the local fake NWS with a fixed upstream latency and reports median
+get_forecast latency and upstream requests per forecast for each phase:
+    cold      empty cache: /points plus the forecast for every location
+    warm      same locations again: only the forecast
+    restart   a new PointsCache on the same SQLite file, as after a server restart
+    prewarm   an empty cache filled with --prewarm's code path before the first call
+
+Usage: python benchmarks/bench_points_cache.py [locations] [nws_latency_ms]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "WeatherPredictor", "weather"))
+
+from fake_nws import FakeNWS  # noqa: E402
+import weather  # noqa: E402
+from points_cache import PointsCache  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+async def phase(name, nws, locations):
+    nws.reset_counts()
+    samples = []
+    for latitude, longitude in locations:
+        start = time.perf_counter()
+        assert "Temperature" in await weather.get_forecast(latitude, longitude)
+        samples.append(time.perf_counter() - start)
+    print(f"{name:<8} median {statistics.median(samples) * 1000:7.1f} ms, "
+          f"{nws.requests / len(locations):.2f} upstream requests per forecast ({nws.requests_by_kind})")
+
+
+async def main(n: int, latency_ms: float):
+    # Spread over a few degrees so locations fall in different grid cells
+    locations = [(30.0 + (i % 40) * 0.07, -97.0 - (i // 40) * 0.07) for i in range(n)]
+    with FakeNWS(latency_ms=latency_ms) as nws, tempfile.TemporaryDirectory() as tmp:
+        weather.NWS_API_BASE = nws.base_url
+        # Only the points cache is measured here; every forecast itself goes upstream
+        weather.response_cache = ResponseCache(max_entries=0)
+        path = os.path.join(tmp, "points.sqlite3")
+
+        weather.points_cache = PointsCache(path)
+        await phase("cold", nws, locations)
+        await phase("warm", nws, locations)
+        weather.points_cache.close()
+
+        weather.points_cache = PointsCache(path)
+        await phase("restart", nws, locations)
+        weather.points_cache.close()
+
+        coordinates = os.path.join(tmp, "locations.txt")
+        with open(coordinates, "w") as f:
+            f.writelines(f"{latitude},{longitude}\n" for latitude, longitude in locations)
+        weather.points_cache = PointsCache(os.path.join(tmp, "prewarmed.sqlite3"))
+        start = time.perf_counter()
+        summary = await weather.prewarm_points(coordinates)
+        print(f"prewarm  {summary['locations']} locations in {time.perf_counter() - start:.2f} s, "
+              f"{len(summary['failed'])} failed")
+        await phase("prewarm", nws, locations)
+        weather.points_cache.close()
+        await weather.close_client()
+
+
+if __name__ == "__main__":
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+                     float(sys.argv[2]) if len(sys.argv) > 2 else 50.0))
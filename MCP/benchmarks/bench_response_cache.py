@@ -0,0 +1,55 @@
+"""get_alerts with and without the NWS response cache, for fresh and for stale entries.
+
+Against the local fake NWS (large alert payloads, fixed upstream latency):
+    no cache      every call downloads and parses the full document
+    fresh         max-age covers the whole run: calls after the first are cache hits
+    revalidated   max-age=0: every call sends If-None-Match and gets a 304, reusing the parsed body
+
+Usage: python benchmarks/bench_response_cache.py [calls] [nws_latency_ms] [alerts]
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, "..", "WeatherPredictor", "weather"))
+
+from fake_nws import FakeNWS  # noqa: E402
+import weather  # noqa: E402
+from response_cache import ResponseCache  # noqa: E402
+
+
+async def run(name, calls, latency_ms, alerts, max_age, cache):
+    with FakeNWS(latency_ms=latency_ms, alerts=alerts, text_bytes=2000, max_age=max_age) as nws:
+        weather.NWS_API_BASE = nws.base_url
+        weather.response_cache = cache
+        await weather.get_alerts("TX")  # first call always goes upstream
+        nws.reset_counts()
+        samples = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            assert "Severe Thunderstorm" in await weather.get_alerts("TX")
+            samples.append(time.perf_counter() - start)
+        await weather.close_client()
+        stats = cache.stats()
+        print(f"{name:<12} median {statistics.median(samples) * 1000:7.2f} ms | upstream {nws.requests:>4} "
+              f"({nws.not_modified} x 304) | hit {stats['hit_rate']:.2f} revalidated "
+              f"{stats['revalidation_rate']:.2f} miss {stats['miss_rate']:.2f}")
+
+
+async def main(calls: int, latency_ms: float, alerts: int):
+    print(f"{calls} get_alerts calls, {alerts} alerts per document, upstream latency {latency_ms} ms")
+    await run("no cache", calls, latency_ms, alerts, 60, ResponseCache(max_entries=0))
+    await run("fresh", calls, latency_ms, alerts, 3600, ResponseCache())
+    await run("revalidated", calls, latency_ms, alerts, 0, ResponseCache())
+
+
+if __name__ == "__main__":
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+                     float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+                     int(sys.argv[3]) if len(sys.argv) > 3 else 200))
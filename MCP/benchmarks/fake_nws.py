@@ -0,0 +1,165 @@
+"""Local stand-in for api.weather.gov with configurable latency and payload size.
+
+Serves the three endpoints the weather server uses:
+    /alerts/active/area/{state}
+    /points/{lat},{lon}
+    /gridpoints/{office}/{x},{y}/forecast
+
+Responses carry Cache-Control max-age, an ETag and a fixed Last-Modified, and conditional
+requests that match either get 304 Not Modified (counted in not_modified).
+
+Usage as a library:
+    with FakeNWS(latency_ms=50, alerts=20, text_bytes=2000) as nws:
+        os.environ["NWS_API_BASE"] = nws.base_url
+
+Or standalone: python fake_nws.py --port 8089 --latency-ms 50
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeNWS:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0,
+                 alerts: int = 5, periods: int = 14, text_bytes: int = 500, max_age: int = 60):
+        self.latency = latency_ms / 1000.0
+        self.alerts = alerts
+        self.periods = periods
+        self.text = ("Lorem ipsum dolor sit amet. " * (text_bytes // 28 + 1))[:text_bytes]
+        self.max_age = max_age
+        # Documents never change, so they keep the Last-Modified of server start
+        self.last_modified = formatdate(usegmt=True)
+        self.requests = 0
+        self.not_modified = 0
+        self.requests_by_kind = {"alerts": 0, "points": 0, "forecast": 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeNWS":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+            self.requests_by_kind = dict.fromkeys(self.requests_by_kind, 0)
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.requests += 1
+            self.requests_by_kind[kind] += 1
+
+    def alerts_body(self, state: str) -> dict:
+        return {"features": [
+            {"properties": {
+                "event": "Severe Thunderstorm Warning",
+                "areaDesc": f"County {i}, {state}",
+                "severity": "Severe",
+                "description": self.text,
+                "instruction": "Move to an interior room on the lowest floor of a sturdy building.",
+            }}
+            for i in range(self.alerts)
+        ]}
+
+    def points_body(self, lat: str, lon: str) -> dict:
+        x, y = int(float(lat) * 10) % 200, int(float(lon) * 10) % 200
+        return {"properties": {
+            "forecast": f"{self.base_url}/gridpoints/TST/{x},{y}/forecast",
+            "gridId": "TST", "gridX": x, "gridY": y,
+        }}
+
+    def forecast_body(self) -> dict:
+        return {"properties": {"periods": [
+            {
+                "name": f"Period {i}",
+                "temperature": 60 + i,
+                "temperatureUnit": "F",
+                "windSpeed": "10 mph",
+                "windDirection": "NW",
+                "detailedForecast": self.text,
+            }
+            for i in range(self.periods)
+        ]}}
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle's algorithm on, the body
+            # waits for the client's delayed ACK and every response takes ~40 ms extra
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if m := re.fullmatch(r"/alerts/active/area/(\w+)", self.path):
+                    fake._count("alerts")
+                    body = fake.alerts_body(m.group(1))
+                elif m := re.fullmatch(r"/points/([-\d.]+),([-\d.]+)", self.path):
+                    fake._count("points")
+                    body = fake.points_body(m.group(1), m.group(2))
+                elif re.fullmatch(r"/gridpoints/\w+/\d+,\d+/forecast", self.path):
+                    fake._count("forecast")
+                    body = fake.forecast_body()
+                else:
+                    self.send_error(404)
+                    return
+                payload = json.dumps(body).encode("utf-8")
+                etag = f'"{hashlib.sha1(payload).hexdigest()[:16]}"'
+                if (self.headers.get("If-None-Match") == etag
+                        or self.headers.get("If-Modified-Since") == fake.last_modified):
+                    with fake._lock:
+                        fake.not_modified += 1
+                    self.send_response(304)
+                    payload = b""
+                else:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/geo+json")
+                    self.send_header("Content-Length", str(len(payload)))
+                self.send_header("Cache-Control", f"public, max-age={fake.max_age}")
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", fake.last_modified)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for api.weather.gov")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--alerts", type=int, default=5)
+    parser.add_argument("--text-bytes", type=int, default=500)
+    args = parser.parse_args()
+    fake = FakeNWS(port=args.port, latency_ms=args.latency_ms, alerts=args.alerts, text_bytes=args.text_bytes)
+    print(f"Fake NWS listening on {fake.base_url}")
+    fake.server.serve_forever()
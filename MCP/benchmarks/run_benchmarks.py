@@ -0,0 +1,213 @@
+"""End-to-end benchmarks for the resale and weather MCP servers.
+
+Measures:
+    resale   cold start (fresh process: import + training, and import + saved-artifact load),
+             single-call estimate_resale_value latency for structured and prompt input,
+             throughput under N concurrent calls
+    weather  get_alerts and get_forecast latency and throughput against a local fake
+             api.weather.gov (see fake_nws.py) with configurable latency and payload size
+
+Results are written as JSON; pass --compare to diff against an earlier run.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --only weather --nws-latency-ms 50 --compare results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESALE_DIR = os.path.join(HERE, "..", "ResaleValuePredictor")
+WEATHER_DIR = os.path.join(HERE, "..", "WeatherPredictor", "weather")
+
+sys.path.insert(0, HERE)
+from fake_nws import FakeNWS  # noqa: E402
+
+PROMPT = ("What's the resale value of a {year} {make} {model} in {condition} condition with "
+          "{mileage:,} mileage, originally bought for ${price:,}?")
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+    }
+
+
+async def measure_latency(make_call, n: int):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        await make_call(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def measure_throughput(make_call, concurrency: int, total: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await make_call(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    return {"concurrency": concurrency, "calls": total, "seconds": round(elapsed, 3),
+            "calls_per_second": round(total / elapsed, 1)}
+
+
+def cold_start(env_overrides, code="import Sale; Sale.warm_up()"):
+    """Seconds for a fresh interpreter to run `code`; by default import Sale and load or train the model."""
+    env = {**os.environ, **env_overrides}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=RESALE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return round(time.perf_counter() - start, 3)
+
+
+def sample_vehicles(n: int, seed: int = 0):
+    import Sale
+    rng = random.Random(seed)
+    pairs = Sale.pd.read_csv(Sale.StringIO(Sale.CSV_DATA))[["make", "model"]].drop_duplicates().values.tolist()
+    vehicles = []
+    for _ in range(n):
+        make, model_name = rng.choice(pairs)
+        year = rng.randint(2000, 2024)
+        vehicles.append({
+            "make": make, "model_name": model_name, "year": year, "age": 2025 - year,
+            "mileage": rng.randint(1000, 300000), "condition": rng.choice(["Poor", "Fair", "Good", "Excellent"]),
+            "original_price": rng.randint(15000, 80000),
+        })
+    return vehicles
+
+
+async def bench_resale(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        results["cold_start_train_seconds"] = cold_start({"RESALE_MODEL_DIR": model_dir})
+        results["cold_start_load_seconds"] = cold_start({"RESALE_MODEL_DIR": model_dir})
+        # Import alone: what the MCP handshake waits for now that the model loads in the background
+        results["cold_start_import_seconds"] = cold_start({"RESALE_MODEL_DIR": model_dir}, "import Sale")
+
+    sys.path.insert(0, RESALE_DIR)
+    start = time.perf_counter()
+    import Sale
+    results["in_process_import_seconds"] = round(time.perf_counter() - start, 3)
+
+    vehicles = sample_vehicles(max(args.calls, args.total))
+    prompts = [PROMPT.format(year=v["year"], make=v["make"], model=v["model_name"], condition=v["condition"],
+                             mileage=v["mileage"], price=v["original_price"]) for v in vehicles]
+
+    structured = lambda i: Sale.estimate_resale_value(**vehicles[i % len(vehicles)])  # noqa: E731
+    prompted = lambda i: Sale.estimate_resale_value(prompt=prompts[i % len(prompts)])  # noqa: E731
+
+    await structured(0)  # warm up the batcher thread
+    results["structured_latency"] = await measure_latency(structured, args.calls)
+    results["prompt_latency"] = await measure_latency(prompted, args.calls)
+    results["structured_throughput"] = [
+        await measure_throughput(structured, c, args.total) for c in args.concurrency
+    ]
+    return results
+
+
+async def bench_weather(args):
+    results = {"nws_latency_ms": args.nws_latency_ms, "nws_text_bytes": args.nws_text_bytes}
+    with FakeNWS(latency_ms=args.nws_latency_ms, alerts=args.nws_alerts, text_bytes=args.nws_text_bytes) as nws:
+        os.environ["NWS_API_BASE"] = nws.base_url
+        sys.path.insert(0, WEATHER_DIR)
+        # Keep the points cache in memory so every run starts cold
+        os.environ.setdefault("NWS_POINTS_CACHE", "")
+        import weather
+        weather.NWS_API_BASE = nws.base_url
+
+        states = ["TX", "CA", "NY", "FL", "OK"]
+        alerts = lambda i: weather.get_alerts(states[i % len(states)])  # noqa: E731
+        forecast = lambda i: weather.get_forecast(30.0 + (i % 50) * 0.1, -97.0 - (i % 50) * 0.1)  # noqa: E731
+
+        nws.reset_counts()
+        results["alerts_latency"] = await measure_latency(alerts, args.calls)
+        results["forecast_latency"] = await measure_latency(forecast, args.calls)
+        results["alerts_throughput"] = [await measure_throughput(alerts, c, args.total) for c in args.concurrency]
+        results["forecast_throughput"] = [await measure_throughput(forecast, c, args.total) for c in args.concurrency]
+        results["upstream_requests"] = dict(nws.requests_by_kind)
+        results["response_cache"] = weather.response_cache.stats()
+        results["coalesced_requests"] = weather.request_counts["coalesced"]
+    return results
+
+
+def compare(current, baseline, path=""):
+    """Print every numeric metric that changed, with its relative change."""
+    if isinstance(current, dict):
+        for key, value in current.items():
+            if isinstance(baseline, dict) and key in baseline:
+                compare(value, baseline[key], f"{path}.{key}" if path else key)
+    elif isinstance(current, list) and isinstance(baseline, list):
+        for i, (a, b) in enumerate(zip(current, baseline)):
+            compare(a, b, f"{path}[{i}]")
+    elif isinstance(current, (int, float)) and isinstance(baseline, (int, float)) and baseline != current:
+        change = (current - baseline) / baseline * 100 if baseline else float("inf")
+        print(f"{path:<55} {baseline:>12} -> {current:>12} ({change:+.1f}%)")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--only", choices=["resale", "weather"])
+    parser.add_argument("--calls", type=int, default=200, help="sequential calls per latency measurement")
+    parser.add_argument("--total", type=int, default=1000, help="calls per throughput measurement")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--nws-latency-ms", type=float, default=20.0)
+    parser.add_argument("--nws-alerts", type=int, default=5)
+    parser.add_argument("--nws-text-bytes", type=int, default=500)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    # Per-request logging from httpx would dominate the weather numbers
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # Measure the model path, not the prediction cache, unless asked otherwise
+    os.environ.setdefault("RESALE_CACHE_MODE", "off")
+
+    report = {"commit": git_commit(), "timestamp": time.time(), "python": sys.version.split()[0],
+              "config": vars(args)}
+    if args.only in (None, "resale"):
+        report["resale"] = await bench_resale(args)
+    if args.only in (None, "weather"):
+        report["weather"] = await bench_weather(args)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nChanges since {baseline.get('commit')}:")
+        compare({k: report[k] for k in ("resale", "weather") if k in report}, baseline)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())